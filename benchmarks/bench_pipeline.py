@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the stages of NewsScraper.fetch_summary_and_named_entities.
+
+Articles come from the deterministic SyntheticBackend, so runs are comparable
+over time. Each stage reports its wall time, throughput and peak memory, and
+results are written as JSON lines, one record per language, size and stage:
+
+    python benchmarks/bench_pipeline.py --sizes 15,500,10000 --output bench.jsonl
+"""
+
+import sys
+import copy
+import json
+import time
+import tempfile
+import statistics
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple, Optional
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import typer
+
+from news_search import Language, NewsScraper, ModelRegistry
+from news_search.dedup import drop_near_duplicates
+from news_search.models import MODEL_NAMES
+from news_search.news_scraper import load_stopwords
+from news_search.backends.synthetic import SyntheticBackend
+
+app = typer.Typer()
+
+
+def measure(
+    function: Callable[[], Any], repeat: int, trace_memory: bool
+) -> Tuple[Any, List[float], Optional[int]]:
+    """
+    Time a function over several runs, and trace its peak memory in one extra run,
+    since tracing slows down the timed runs considerably.
+
+    Returns:
+        The result of the last run, the wall times of all timed runs in seconds,
+        and the peak of newly allocated memory in bytes if traced
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            result = function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, times, peak
+
+
+def bench_language(
+    language: Language,
+    num_articles: int,
+    models: ModelRegistry,
+    repeat: int,
+    trace_memory: bool,
+    outdir: Path,
+) -> List[Dict[str, Any]]:
+    """
+    Run all stages for one language and number of articles.
+    """
+    topic = "energy prices"
+    updated_after = datetime.now() - timedelta(days=30)
+    scraper = NewsScraper(backend=SyntheticBackend(), language=language, models=models)
+
+    # Loading the model is only paid once per process, measure it on its own
+    start = time.perf_counter()
+    nlp = models.get(language)
+    model_load_time = time.perf_counter() - start
+
+    stages = []
+
+    def run_stage(name: str, function: Callable[[], Any], num_inputs: int):
+        result, times, peak = measure(function, repeat, trace_memory)
+        stages.append((name, num_inputs, times, peak))
+        return result
+
+    articles = run_stage(
+        "fetch",
+        lambda: scraper.backend.fetch_for_topic(
+            topic, num_articles, updated_after, language
+        ),
+        num_articles,
+    )
+    unique_articles = run_stage(
+        "drop_near_duplicates",
+        # Copies, since the duplicate counts are updated in place
+        lambda: drop_near_duplicates([copy.copy(article) for article in articles]),
+        len(articles),
+    )
+    docs = run_stage(
+        "parse_headlines",
+        lambda: scraper.parse_headlines(nlp, unique_articles),
+        len(unique_articles),
+    )
+    ranked = run_stage(
+        "rate_relevance",
+        lambda: scraper.rate_relevance(
+            topic, nlp, unique_articles, docs, top_k=num_articles
+        ),
+        len(unique_articles),
+    )
+    run_stage(
+        "generate_summary",
+        lambda: scraper.generate_summary(
+            nlp, load_stopwords(language), unique_articles, docs
+        ),
+        len(unique_articles),
+    )
+    run_stage(
+        "return_named_entities",
+        lambda: scraper.return_named_entities(nlp, unique_articles, docs),
+        len(unique_articles),
+    )
+    run_stage(
+        "save_articles",
+        lambda: scraper.save_articles(
+            ranked, outdir / f"{language.value}_{num_articles}.csv"
+        ),
+        len(ranked),
+    )
+
+    records = [
+        {
+            "stage": "model_load",
+            "wall_time_s": model_load_time,
+            "min_wall_time_s": model_load_time,
+            "throughput_per_s": None,
+            "peak_memory_bytes": None,
+            "num_inputs": 0,
+        }
+    ]
+    for name, num_inputs, times, peak in stages:
+        median = statistics.median(times)
+        records.append(
+            {
+                "stage": name,
+                "wall_time_s": median,
+                "min_wall_time_s": min(times),
+                "throughput_per_s": num_inputs / median if median else None,
+                "peak_memory_bytes": peak,
+                "num_inputs": num_inputs,
+            }
+        )
+
+    for record in records:
+        record.update(
+            {
+                "language": language.value,
+                "num_articles": num_articles,
+                "repeat": repeat,
+            }
+        )
+    return records
+
+
+@app.command()
+def main(
+    sizes: str = typer.Option("15,500,10000", help="Comma separated article counts"),
+    languages: str = typer.Option("en,de", help="Comma separated languages"),
+    repeat: int = typer.Option(3, help="Timed runs per stage"),
+    memory: bool = typer.Option(True, help="Trace peak memory in an extra run"),
+    output: Optional[Path] = typer.Option(
+        None, help="JSON lines file to append results to, stdout if not given"
+    ),
+    en_model: str = typer.Option(MODEL_NAMES[Language.english]),
+    de_model: str = typer.Option(MODEL_NAMES[Language.german]),
+):
+    models = ModelRegistry({Language.english: en_model, Language.german: de_model})
+    run = {
+        "run_started": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+    }
+
+    with tempfile.TemporaryDirectory() as outdir:
+        records = []
+        for language in languages.split(","):
+            for size in sizes.split(","):
+                for record in bench_language(
+                    Language(language.strip()),
+                    int(size),
+                    models,
+                    repeat,
+                    memory,
+                    Path(outdir),
+                ):
+                    records.append({**run, **record})
+
+    lines = "".join(json.dumps(record) + "\n" for record in records)
+    if output is None:
+        sys.stdout.write(lines)
+    else:
+        with open(output, "a") as outfile:
+            outfile.write(lines)
+
+    # Human readable overview, kept off stdout so that stays machine readable
+    for record in records:
+        print(
+            f"{record['language']} {record['num_articles']:>6} "
+            f"{record['stage']:<22} {record['wall_time_s'] * 1e3:>10.2f} ms",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check the cold import time of the news_search package against a budget.
+
+Each run imports the package in a fresh interpreter with -X importtime, and the
+fastest run is compared to the budget. It also fails if importing the package
+drags in any of the heavy dependencies that are meant to be imported lazily:
+
+    python benchmarks/import_time.py --budget-ms 150
+"""
+
+import sys
+import json
+import subprocess
+from typing import List, Tuple
+
+import typer
+
+# Dependencies that must only be imported once the stage or backend needing them runs
+HEAVY_MODULES = ["spacy", "numpy", "thinc", "requests", "GoogleNews"]
+
+app = typer.Typer()
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        The cumulative import time of the module in milliseconds, and the heavy
+        modules it imported
+    """
+    script = (
+        f"import sys, json, {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # Lines look like "import time: self [us] | cumulative | imported package"
+    cumulative_us = None
+    for line in process.stderr.splitlines():
+        parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    if cumulative_us is None:
+        raise RuntimeError(f"No import time reported for {module}")
+
+    return cumulative_us / 1e3, json.loads(process.stdout)
+
+
+@app.command()
+def main(
+    module: str = "news_search",
+    budget_ms: float = typer.Option(150, help="Maximum import time in milliseconds"),
+    runs: int = typer.Option(5, help="Fresh interpreters to take the fastest of"),
+):
+    times = []
+    heavy_modules = []
+    for _ in range(runs):
+        import_ms, heavy_modules = measure_import(module)
+        times.append(import_ms)
+
+    fastest = min(times)
+    print(
+        json.dumps(
+            {
+                "module": module,
+                "import_time_ms": fastest,
+                "budget_ms": budget_ms,
+                "heavy_modules": heavy_modules,
+            }
+        )
+    )
+
+    if heavy_modules:
+        print(f"Importing {module} also imports {heavy_modules}", file=sys.stderr)
+    if fastest > budget_ms:
+        print(f"Import time over budget: {fastest:.1f} ms", file=sys.stderr)
+    if heavy_modules or fastest > budget_ms:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,57 +1,184 @@
 #!/usr/bin/env python3
 
+import os
+import csv
+import json
 import datetime
-from typing import Dict
+from typing import Dict, List, Optional
 from pathlib import Path
+from threading import Lock
+from contextlib import contextmanager
 
 import typer
 import dateutil.relativedelta
 
 from news_search import Language, NewsScraper
-from news_search.backends import NewsBackend, NewsApiBackend, GoogleNewsBackend
+from news_search.service import NewsService, create_server
+from news_search.watch import TopicChanges, WatchedTopic, Watcher
+from news_search.trends import TrendTracker
+from news_search.writers import create_writer
+from news_search.summarizers import Summarizer, TermStatistics, TfIdfSummarizer
+from news_search.vector_cache import VectorCache
+from news_search.instrumentation import (
+    JsonLinesExporter,
+    PrometheusExporter,
+    instrumentation,
+)
+from news_search.backends import (
+    NewsBackend,
+    BackendCache,
+    ArticleStore,
+    StoredBackend,
+    FederatedBackend,
+    get_backend,
+)
 
-# Map to match user input string with the respective backend
-# classes to instantiate below.
-backend_map = {
-    "googlenews": GoogleNewsBackend,
-    "newsapi": NewsApiBackend,
-}
-
-# NewsApiClient requires an API key, so we need to prompt for this
+# NewsAPI requires an API key, so we need to prompt for this
 def query_for_args(args: Dict[str, str]) -> Dict[str, str]:
     user_choices = {}
     for arg, prompt in args.items():
         user_choices[arg] = typer.prompt(prompt)
     return user_choices
 
+
+def create_backend(
+    backend: str,
+    cache_dir: Optional[Path] = None,
+    cache_ttl: int = 3600,
+    timeout: float = 10,
+    store: Optional[Path] = None,
+) -> NewsBackend:
+    """
+    Instantiate the backend(s) given as comma separated names, prompting for
+    required arguments. Several backends are queried together, and with a store
+    only articles newer than the stored ones are fetched.
+    """
+    cache = BackendCache(cache_dir, ttl=cache_ttl) if cache_dir is not None else None
+
+    news_backends = []
+    for name in backend.split(","):
+        # Backends are looked up by name, so only the selected SDKs get imported
+        backend_class = get_backend(name.strip())
+        backend_args = backend_class.get_required_args()
+        user_choices = query_for_args(backend_args) if backend_args else {}
+
+        news_backend = backend_class(**user_choices)
+        news_backend.cache = cache
+        news_backends.append(news_backend)
+
+    if len(news_backends) == 1:
+        news_backend = news_backends[0]
+    else:
+        news_backend = FederatedBackend(news_backends, timeout=timeout)
+
+    if store is not None:
+        news_backend = StoredBackend(news_backend, ArticleStore(store))
+    return news_backend
+
+
+def create_summarizer(
+    language: Language, term_stats_dir: Optional[Path] = None
+) -> Summarizer:
+    """
+    Create the TF-IDF summarizer of a language, keeping its term statistics in
+    term_stats_dir across runs if given.
+    """
+    statistics = None
+    if term_stats_dir is not None:
+        statistics = TermStatistics(
+            term_stats_dir / f"term_statistics_{language.value}.json"
+        )
+    return TfIdfSummarizer(statistics)
+
+
+@contextmanager
+def export_metrics(metrics_file: Optional[Path]):
+    """
+    Record the metrics of all queries run within the context to a file, in the
+    Prometheus text format for .prom files and as JSON lines otherwise.
+    """
+    if metrics_file is None:
+        yield
+        return
+
+    if metrics_file.suffix == ".prom":
+        exporter = PrometheusExporter()
+    else:
+        exporter = JsonLinesExporter(metrics_file)
+
+    instrumentation.add_hook(exporter)
+    try:
+        yield
+    finally:
+        instrumentation.remove_hook(exporter)
+        if isinstance(exporter, PrometheusExporter):
+            exporter.write(metrics_file)
+        else:
+            exporter.close()
+
+
 app = typer.Typer()
 
 @app.command()
 def run(
     topic: str,
     language: str = typer.Argument("en", help="Language for news articles"),
-    backend: str = typer.Argument("NewsApi", help="Backend for fetching news articles"),
+    backend: str = typer.Argument(
+        "NewsApi",
+        help="Backend for fetching news articles, or several separated by commas",
+    ),
     max_num_articles: int = 15,
+    cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache backend responses in across runs"
+    ),
+    cache_ttl: int = typer.Option(3600, help="Seconds until cached responses expire"),
+    timeout: float = typer.Option(
+        10, help="Seconds to wait for each backend when querying several"
+    ),
+    store: Optional[Path] = typer.Option(
+        None, help="SQLite file to keep all fetched articles in"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, help="File to write metrics to, Prometheus format for .prom files"
+    ),
+    term_stats_dir: Optional[Path] = typer.Option(
+        None, help="Directory to keep the summarizer's term statistics in across runs"
+    ),
+    trends_file: Optional[Path] = typer.Option(
+        None, help="File to count the named entities of every query in, see trends"
+    ),
+    vector_cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache headline vectors in across runs"
+    ),
+    output_format: str = typer.Option(
+        "csv", help="Format to save the articles in: csv, jsonl or parquet"
+    ),
 ):
     backend = backend.lower()
 
-    assert backend in backend_map, f"Backend {backend} unknown or unsupported!"
-    backend_class = backend_map[backend]
-    backend_args = backend_class.get_required_args()
-    user_choices = query_for_args(backend_args) if backend_args else {}
-
+    news_backend = create_backend(backend, cache_dir, cache_ttl, timeout, store)
     scraper = NewsScraper(
-        backend=backend_class(**user_choices), language=Language(language)
-    )
-    outfile = Path(f"results/{topic.replace(' ', '_')}_summary.csv")
-
-    summarized_articles, sorted_entities = scraper.fetch_summary_and_named_entities(
-        topic,
-        max_num_articles,
-        updated_after=datetime.datetime.today()
-        - dateutil.relativedelta.relativedelta(months=1),
-        outfile=outfile,
+        backend=news_backend,
+        language=Language(language),
+        summarizer=create_summarizer(Language(language), term_stats_dir),
+        trend_tracker=TrendTracker(trends_file) if trends_file else None,
+        vector_cache=VectorCache(vector_cache_dir) if vector_cache_dir else None,
     )
+    outfile = Path(f"results/{topic.replace(' ', '_')}_summary.{output_format}")
+
+    with export_metrics(metrics_file):
+        summarized_articles, sorted_entities = (
+            scraper.fetch_summary_and_named_entities(
+                topic,
+                max_num_articles,
+                updated_after=datetime.datetime.today()
+                - dateutil.relativedelta.relativedelta(months=1),
+                outfile=outfile,
+            )
+        )
+    scraper.summarizer.save()
+    if scraper.trend_tracker is not None:
+        scraper.trend_tracker.save()
 
     print(
         "Here's your summary of the news articles: \n",
@@ -66,7 +193,367 @@ def run(
     rerun = typer.confirm("Wanna rerun?")
     if rerun:
         new_topic = typer.prompt("Give me another topic")
-        run(new_topic, language, backend, max_num_articles)
+        run(
+            new_topic,
+            language,
+            backend,
+            max_num_articles,
+            cache_dir,
+            cache_ttl,
+            timeout,
+            store,
+            metrics_file,
+            term_stats_dir,
+            trends_file,
+            vector_cache_dir,
+            output_format,
+        )
+
+
+def read_topics(topics_file: Path) -> List[str]:
+    """
+    Read one topic per line, skipping empty lines and comments starting with #.
+    """
+    topics = []
+    for line in topics_file.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            topics.append(line)
+    return topics
+
+
+def read_watched_topics(topics_file: Path) -> List[WatchedTopic]:
+    """
+    Read one topic per line as "topic,interval_seconds[,backend]", skipping empty
+    lines and comments starting with #. Topics containing commas must be quoted.
+    """
+    lines = [
+        line
+        for line in topics_file.read_text().splitlines()
+        if line.strip() and not line.strip().startswith("#")
+    ]
+    watched = []
+    for row in csv.reader(lines, skipinitialspace=True):
+        if len(row) not in (2, 3):
+            raise ValueError(f"Expected topic,interval_seconds[,backend], got {row}")
+        backend = row[2].strip().lower() if len(row) == 3 else None
+        watched.append(WatchedTopic(row[0].strip(), float(row[1]), backend))
+    return watched
+
+
+@app.command()
+def batch(
+    topics_file: Path = typer.Argument(..., help="File with one topic per line"),
+    language: str = typer.Argument("en", help="Language for news articles"),
+    backend: str = typer.Argument(
+        "NewsApi",
+        help="Backend for fetching news articles, or several separated by commas",
+    ),
+    max_num_articles: int = 15,
+    outdir: Path = typer.Option(Path("results"), help="Directory for the results"),
+    processes: int = typer.Option(
+        os.cpu_count() or 1, help="Worker processes for the NLP stages"
+    ),
+    fetch_workers: int = typer.Option(8, help="Topics fetched at the same time"),
+    cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache backend responses in across runs"
+    ),
+    cache_ttl: int = typer.Option(3600, help="Seconds until cached responses expire"),
+    timeout: float = typer.Option(
+        10, help="Seconds to wait for each backend when querying several"
+    ),
+    store: Optional[Path] = typer.Option(
+        None, help="SQLite file to keep all fetched articles in"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, help="File to write metrics to, Prometheus format for .prom files"
+    ),
+    term_stats_dir: Optional[Path] = typer.Option(
+        None, help="Directory to keep the summarizer's term statistics in across runs"
+    ),
+    trends_file: Optional[Path] = typer.Option(
+        None, help="File to count the named entities of every query in, see trends"
+    ),
+    vector_cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache headline vectors in across runs"
+    ),
+    output_format: str = typer.Option(
+        "csv", help="Format to save the articles in: csv, jsonl or parquet"
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        help="Single file to stream the articles of all topics to, instead of outdir",
+    ),
+    append: bool = typer.Option(False, help="Add to --output instead of replacing it"),
+):
+    topics = read_topics(topics_file)
+
+    news_backend = create_backend(
+        backend.lower(), cache_dir, cache_ttl, timeout, store
+    )
+    scraper = NewsScraper(
+        backend=news_backend,
+        language=Language(language),
+        summarizer=create_summarizer(Language(language), term_stats_dir),
+        trend_tracker=TrendTracker(trends_file) if trends_file else None,
+        vector_cache=VectorCache(vector_cache_dir) if vector_cache_dir else None,
+    )
+
+    with export_metrics(metrics_file):
+        results = scraper.fetch_many(
+            topics,
+            max_num_articles,
+            updated_after=datetime.datetime.today()
+            - dateutil.relativedelta.relativedelta(months=1),
+            outdir=outdir,
+            max_fetch_workers=fetch_workers,
+            n_process=processes,
+            outfile=output,
+            append=append,
+            file_format=output_format,
+            # Only summaries and entities are printed, articles are only saved
+            keep_articles=False,
+        )
+    scraper.summarizer.save()
+    if scraper.trend_tracker is not None:
+        scraper.trend_tracker.save()
+
+    for result in results.values():
+        print(
+            f"{result.topic}: \n",
+            result.summary,
+            "\n",
+            result.named_entities,
+            "\n",
+        )
+
+    failed = [topic for topic in topics if topic not in results]
+    if failed:
+        print("These topics failed: \n", failed)
+
+
+@app.command()
+def search(
+    query: str,
+    store: Path = typer.Option(
+        Path("results/articles.sqlite"), help="SQLite file with the stored articles"
+    ),
+    language: Optional[str] = typer.Option(None, help="Only search this language"),
+    limit: int = 20,
+):
+    """
+    Search all articles fetched so far, without going to the web.
+    """
+    articles = ArticleStore(store).search(
+        query, Language(language) if language else None, limit
+    )
+    for article in articles:
+        print(article.last_updated, article.title, article.URL, sep="\t")
+
+
+@app.command()
+def trends(
+    trends_file: Path = typer.Argument(
+        ..., help="File the named entities were counted in"
+    ),
+    language: str = typer.Argument("en", help="Language of the entities"),
+    k: int = typer.Option(10, help="Number of entities to report"),
+    hours: float = typer.Option(
+        24, help="Compare the last this many hours with the hours before"
+    ),
+):
+    """
+    Report the named entities rising most across all queries run with --trends-file.
+    """
+    tracker = TrendTracker(trends_file)
+    trending = tracker.trending(
+        Language(language), k, datetime.timedelta(hours=hours)
+    )
+    for trend in trending:
+        print(trend.entity, trend.count, f"{trend.change:+d}", sep="\t")
+
+
+@app.command()
+def serve(
+    backends: str = typer.Option(
+        "googlenews", help="Backends to offer, separated by commas"
+    ),
+    languages: str = typer.Option("en,de", help="Languages to offer"),
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    max_num_articles: int = 15,
+    cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache backend responses in across runs"
+    ),
+    cache_ttl: int = typer.Option(3600, help="Seconds until cached responses expire"),
+    store: Optional[Path] = typer.Option(
+        None, help="SQLite file to keep all fetched articles in"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, help="File to write metrics to, Prometheus format for .prom files"
+    ),
+    term_stats_dir: Optional[Path] = typer.Option(
+        None, help="Directory to keep the summarizer's term statistics in across runs"
+    ),
+    trends_file: Optional[Path] = typer.Option(
+        None, help="File to count the named entities of every query in, see trends"
+    ),
+    vector_cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache headline vectors in across runs"
+    ),
+):
+    """
+    Serve queries over HTTP as JSON, keeping models and backends warm.
+    """
+    news_backends = {
+        name.strip(): create_backend(name.strip(), cache_dir, cache_ttl, store=store)
+        for name in backends.lower().split(",")
+    }
+    offered_languages = [
+        Language(language.strip()) for language in languages.split(",")
+    ]
+    service = NewsService(
+        news_backends,
+        languages=offered_languages,
+        max_num_articles=max_num_articles,
+        summarizers={
+            language: create_summarizer(language, term_stats_dir)
+            for language in offered_languages
+        },
+        trend_tracker=TrendTracker(trends_file) if trends_file else None,
+        vector_cache=VectorCache(vector_cache_dir) if vector_cache_dir else None,
+    )
+    service.warm_up()
+
+    server = create_server(service, host, port)
+    print(f"Serving on http://{host}:{server.server_port}/search?topic=...")
+    with export_metrics(metrics_file):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.save()
+
+
+@app.command()
+def watch(
+    topics_file: Path = typer.Argument(
+        ..., help="File with one topic,interval_seconds[,backend] per line"
+    ),
+    language: str = typer.Argument("en", help="Language for news articles"),
+    backends: str = typer.Option(
+        "googlenews",
+        help="Backends topics may name, separated by commas, the first is the default",
+    ),
+    max_num_articles: int = 15,
+    max_concurrency: int = typer.Option(4, help="Polls running at the same time"),
+    max_per_backend: int = typer.Option(
+        2, help="Polls querying the same backend at the same time"
+    ),
+    jitter: float = typer.Option(
+        0.1, help="Share of the interval by which polls are randomly moved"
+    ),
+    initial_days: float = typer.Option(
+        30, help="Days to look back on the first poll of a topic"
+    ),
+    state_file: Optional[Path] = typer.Option(
+        None, help="JSON file to remember the last polls in across runs"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, help="File to stream the new articles of all topics to"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache backend responses in across runs"
+    ),
+    cache_ttl: int = typer.Option(3600, help="Seconds until cached responses expire"),
+    store: Optional[Path] = typer.Option(
+        None, help="SQLite file to keep all fetched articles in"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, help="File to write metrics to, Prometheus format for .prom files"
+    ),
+    term_stats_dir: Optional[Path] = typer.Option(
+        None, help="Directory to keep the summarizer's term statistics in across runs"
+    ),
+    trends_file: Optional[Path] = typer.Option(
+        None, help="File to count the named entities of every query in, see trends"
+    ),
+    vector_cache_dir: Optional[Path] = typer.Option(
+        None, help="Directory to cache headline vectors in across runs"
+    ),
+):
+    """
+    Poll topics at their own intervals and print what changed as JSON lines.
+    """
+    topics = read_watched_topics(topics_file)
+    language = Language(language)
+
+    # All scrapers share one summarizer, trend tracker and vector cache
+    summarizer = create_summarizer(language, term_stats_dir)
+    trend_tracker = TrendTracker(trends_file) if trends_file else None
+    vector_cache = VectorCache(vector_cache_dir) if vector_cache_dir else None
+    names = [name.strip() for name in backends.lower().split(",")]
+    names += [watched.backend for watched in topics if watched.backend]
+    scrapers = {
+        name: NewsScraper(
+            backend=create_backend(name, cache_dir, cache_ttl, store=store),
+            save_on_fetch=False,
+            language=language,
+            summarizer=summarizer,
+            trend_tracker=trend_tracker,
+            vector_cache=vector_cache,
+        )
+        for name in dict.fromkeys(names)
+    }
+
+    writer = create_writer(output, append=True, with_topic=True) if output else None
+    output_lock = Lock()
+
+    def report(changes: TopicChanges):
+        with output_lock:
+            print(
+                json.dumps(
+                    {
+                        "topic": changes.topic,
+                        "backend": changes.backend,
+                        "polled_at": changes.polled_at.isoformat(),
+                        "new_articles": len(changes.articles),
+                        "summary": changes.summary,
+                        "new_entities": changes.new_entities,
+                    }
+                ),
+                flush=True,
+            )
+            if writer is not None:
+                writer.write(changes.articles, topic=changes.topic)
+
+    watcher = Watcher(
+        scrapers,
+        topics,
+        max_num_articles=max_num_articles,
+        max_concurrency=max_concurrency,
+        max_per_backend=max_per_backend,
+        jitter=jitter,
+        initial_window=datetime.timedelta(days=initial_days),
+        state_file=state_file,
+        on_changes=report,
+    )
+
+    # Load the model before the first poll, it stays warm for all of them
+    scrapers[names[0]].models.get(language)
+    with export_metrics(metrics_file):
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if writer is not None:
+                writer.close()
+            summarizer.save()
+            if trend_tracker is not None:
+                trend_tracker.save()
 
 
 if __name__ == "__main__":
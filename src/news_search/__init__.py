@@ -1,2 +1,4 @@
 from news_search.backends import Language, NewsArticle
+from news_search.models import ModelRegistry, model_registry
+from news_search.instrumentation import Instrumentation, instrumentation
 from news_search.news_scraper import NewsScraper
@@ -1,5 +1,61 @@
 # Re-export to allow for simpler imports such as
 # from news_search.backends import GoogleNewsBackend
-from news_search.backends.news_api import NewsApiBackend
-from news_search.backends.google_news import GoogleNewsBackend
+#
+# Only the backend interface is imported right away. Backends and helpers pull
+# in heavy SDKs such as GoogleNews or requests, so they are imported on first
+# access, either by attribute or through the backend registry below.
+import importlib
+from typing import Dict, Type, Union
+
 from news_search.backends.news_backend import Language, NewsArticle, NewsBackend
+
+# Modules of everything else re-exported here, imported on first access
+_LAZY_EXPORTS = {
+    "BackendCache": "news_search.backends.cache",
+    "NewsApiBackend": "news_search.backends.news_api",
+    "FederatedBackend": "news_search.backends.federated",
+    "ArticleStore": "news_search.backends.store",
+    "StoredBackend": "news_search.backends.store",
+    "SyntheticBackend": "news_search.backends.synthetic",
+    "GoogleNewsBackend": "news_search.backends.google_news",
+}
+
+# Backends by the name users select them with, as "module:class" until first use
+BACKENDS: Dict[str, Union[str, Type[NewsBackend]]] = {
+    "googlenews": "news_search.backends.google_news:GoogleNewsBackend",
+    "newsapi": "news_search.backends.news_api:NewsApiBackend",
+    "synthetic": "news_search.backends.synthetic:SyntheticBackend",
+}
+
+
+def register_backend(name: str, backend: Union[str, Type[NewsBackend]]):
+    """
+    Make a backend selectable by name.
+
+    Args:
+        name : Name to select the backend with, case insensitive
+        backend : The backend class, or "module:class" to import it lazily
+    """
+    BACKENDS[name.lower()] = backend
+
+
+def get_backend(name: str) -> Type[NewsBackend]:
+    """
+    Return the backend class registered under a name, importing it if necessary.
+    """
+    try:
+        backend = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Backend {name} unknown or unsupported!") from None
+
+    if isinstance(backend, str):
+        module, _, class_name = backend.partition(":")
+        backend = getattr(importlib.import_module(module), class_name)
+        BACKENDS[name.lower()] = backend
+    return backend
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,210 @@
+import json
+import os
+import time
+import hashlib
+from typing import Dict, List, Tuple, Union, Optional
+from pathlib import Path
+from datetime import datetime
+from threading import Lock
+from dataclasses import asdict, replace
+from collections import OrderedDict
+
+from news_search.backends.normalize import parse_timestamp
+from news_search.backends.news_backend import Language, NewsArticle
+
+
+class BackendCache:
+    """
+    Two-tier cache for backend responses, with an in-memory LRU tier in front of
+    an optional on-disk tier. Entries expire after a fixed time to live and both
+    tiers are bounded in size, dropping the least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = None,
+        ttl: float = 3600,
+        max_memory_entries: int = 128,
+        max_disk_entries: int = 1024,
+        bucket_seconds: float = 3600,
+    ):
+        """
+        Args:
+            directory : Directory for the on-disk tier, memory only if not given
+            ttl : Number of seconds after which entries expire
+            max_memory_entries : Maximum number of entries kept in memory
+            max_disk_entries : Maximum number of entries kept on disk
+            bucket_seconds : Granularity of updated_after in the cache key, so queries
+                for (almost) the same date window share their entries
+        """
+        self.directory = Path(directory) if directory is not None else None
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.bucket_seconds = bucket_seconds
+
+        self._memory: OrderedDict[str, Tuple[float, List[NewsArticle]]] = OrderedDict()
+        self._lock = Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(exist_ok=True, parents=True)
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit and miss counters as well as the current size of both tiers.
+        """
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_entries()),
+        }
+
+    def make_key(
+        self,
+        backend,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> str:
+        """
+        Build the cache key of a fetch_for_topic call.
+        """
+        bucket = int(updated_after.timestamp() // self.bucket_seconds)
+        key = [
+            type(backend).__name__,
+            topic,
+            Language(language).value,
+            bucket,
+            max_num_articles,
+        ]
+        return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[NewsArticle]]:
+        """
+        Look up the articles stored for a key.
+
+        Returns:
+            Copies of the cached articles, or None if there is no valid entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return _copy_articles(entry[1])
+
+            entry = self._read_from_disk(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._store_in_memory(key, entry)
+                self.disk_hits += 1
+                return _copy_articles(entry[1])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, articles: List[NewsArticle]):
+        """
+        Store the articles returned for a key in both tiers.
+        """
+        entry = (time.time(), _copy_articles(articles))
+        with self._lock:
+            self._store_in_memory(key, entry)
+            self._write_to_disk(key, entry)
+
+    def clear(self):
+        """
+        Drop all entries from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+            for path in self._disk_entries():
+                path.unlink(missing_ok=True)
+
+    def _store_in_memory(self, key: str, entry: Tuple[float, List[NewsArticle]]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self) -> List[Path]:
+        if self.directory is None:
+            return []
+        return list(self.directory.glob("*.json"))
+
+    def _read_from_disk(self, key: str) -> Optional[Tuple[float, List[NewsArticle]]]:
+        if self.directory is None:
+            return None
+
+        path = self.directory / f"{key}.json"
+        try:
+            with open(path) as cachefile:
+                content = json.load(cachefile)
+            # Touch the file so eviction on disk follows the last access
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        articles = [_article_from_json(article) for article in content["articles"]]
+        return content["created"], articles
+
+    def _write_to_disk(self, key: str, entry: Tuple[float, List[NewsArticle]]):
+        if self.directory is None:
+            return
+
+        created, articles = entry
+        content = {
+            "created": created,
+            "articles": [_article_to_json(article) for article in articles],
+        }
+        # Write to a temporary file first, so readers never see partial entries
+        path = self.directory / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as cachefile:
+            json.dump(content, cachefile)
+        os.replace(tmp_path, path)
+
+        # Evict the least recently used entries once the disk tier is full
+        entries = self._disk_entries()
+        if len(entries) > self.max_disk_entries:
+            entries.sort(key=_modification_time)
+            for stale_path in entries[: len(entries) - self.max_disk_entries]:
+                stale_path.unlink(missing_ok=True)
+
+
+def _copy_articles(articles: List[NewsArticle]) -> List[NewsArticle]:
+    # Callers update the relevancy scores in place, which must not leak into the cache
+    return [replace(article) for article in articles]
+
+
+def _article_to_json(article: NewsArticle) -> dict:
+    content = asdict(article)
+    if article.last_updated is not None:
+        content["last_updated"] = article.last_updated.isoformat()
+    return content
+
+
+def _article_from_json(content: dict) -> NewsArticle:
+    article = NewsArticle(**content)
+    article.last_updated = parse_timestamp(article.last_updated)
+    return article
+
+
+def _modification_time(path: Path) -> float:
+    # Entries might be evicted by another process in the meantime
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0
@@ -0,0 +1,198 @@
+import time
+import logging
+from typing import Any, Dict, List, Callable, Sequence
+from datetime import datetime
+from itertools import zip_longest
+from threading import Thread, BoundedSemaphore
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from news_search.backends.normalize import normalize_url, normalize_title
+from news_search.backends.news_backend import Language, NewsArticle, NewsBackend
+
+logger = logging.getLogger(__name__)
+
+
+class FederatedBackend(NewsBackend):
+    """
+    Class to query several backends at the same time and merge their results.
+
+    Backends are queried in parallel, so the slowest backend that still answers
+    in time determines the latency. Backends that fail or time out are left out
+    of the result instead of failing the whole query.
+
+    Each query runs in daemon threads, which are left behind when their backend
+    times out and do not keep the interpreter alive at exit. Backends with a
+    timeout attribute, such as NewsApiBackend, get their timeout lowered to the
+    one given here, so that abandoned requests end soon after. At most
+    max_pending queries run per backend, a backend with as many queries still
+    hanging is skipped.
+    """
+
+    def __init__(
+        self,
+        backends: List[NewsBackend],
+        timeout: float = 10,
+        timeouts: Sequence[float] = None,
+        max_pending: int = 8,
+    ):
+        """
+        Args:
+            backends : The backends to query
+            timeout : Seconds to wait for each backend
+            timeouts : Seconds to wait for the backend at the same position,
+                overriding timeout for that backend
+            max_pending : Maximum number of queries running per backend
+        """
+        if not backends:
+            raise ValueError("At least one backend is required.")
+        if timeouts is not None and len(timeouts) != len(backends):
+            raise ValueError("Need exactly one timeout per backend.")
+
+        self.backends = list(backends)
+        self.timeouts = (
+            list(timeouts) if timeouts is not None else [timeout] * len(backends)
+        )
+        for backend, backend_timeout in zip(self.backends, self.timeouts):
+            if getattr(backend, "timeout", None) is not None:
+                backend.timeout = min(backend.timeout, backend_timeout)
+        self._slots = [BoundedSemaphore(max_pending) for _ in self.backends]
+        # Errors of the backends that did not contribute to the last query
+        self.last_errors: Dict[str, BaseException] = {}
+
+    @staticmethod
+    def get_required_args() -> Dict[str, str]:
+        return {}
+
+    def _fetch_for_topic(
+        self,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> List[NewsArticle]:
+        start = time.monotonic()
+        futures = {}
+        for index, timeout in enumerate(self.timeouts):
+            if self._slots[index].acquire(blocking=False):
+                future = _run_in_thread(
+                    self._fetch_from,
+                    index,
+                    topic,
+                    max_num_articles,
+                    updated_after,
+                    language,
+                )
+            else:
+                future = Future()
+                future.set_exception(
+                    RuntimeError("Too many earlier queries still running")
+                )
+            futures[future] = (index, start + timeout)
+
+        # Wait for every backend until it answers or its own deadline has passed
+        pending = {future for future in futures if not future.done()}
+        while pending:
+            next_deadline = min(futures[future][1] for future in pending)
+            _, pending = wait(
+                pending,
+                timeout=max(next_deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            now = time.monotonic()
+            pending = {future for future in pending if futures[future][1] > now}
+
+        results: List[List[NewsArticle]] = [[] for _ in self.backends]
+        errors = {}
+        for future, (index, _) in futures.items():
+            name = f"{index}:{type(self.backends[index]).__name__}"
+            if not future.done():
+                errors[name] = TimeoutError(
+                    f"No response within {self.timeouts[index]} seconds"
+                )
+            elif future.exception() is not None:
+                errors[name] = future.exception()
+            else:
+                results[index] = future.result()
+
+        for name, error in errors.items():
+            logger.warning("Backend %s failed for topic %r: %s", name, topic, error)
+        self.last_errors = errors
+
+        if len(errors) == len(self.backends):
+            raise RuntimeError(f"All backends failed for topic {topic!r}.") from next(
+                iter(errors.values())
+            )
+
+        return merge_articles(results, max_num_articles)
+
+    def _fetch_from(self, index: int, *args) -> List[NewsArticle]:
+        try:
+            return self.backends[index].fetch_for_topic(*args)
+        finally:
+            self._slots[index].release()
+
+
+def _run_in_thread(function: Callable[..., Any], *args) -> Future:
+    """
+    Call a function in a new daemon thread and return the future of its result.
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(function(*args))
+        except BaseException as error:
+            future.set_exception(error)
+
+    Thread(target=run, daemon=True).start()
+    return future
+
+
+def merge_articles(
+    results: List[List[NewsArticle]], max_num_articles: int = None
+) -> List[NewsArticle]:
+    """
+    Merge the articles of several backends and drop duplicates.
+
+    Results are interleaved, so the top articles of each backend are kept first.
+    Articles count as duplicates if their normalized URL or title was seen before.
+    Titles also match when they only differ by a publisher appended to one of
+    them, but not when both end in different " - " suffixes, which are just as
+    likely part of the headline itself.
+
+    Args:
+        results : One list of articles per backend, each sorted by relevance
+        max_num_articles : The total number of articles to return
+
+    Returns:
+        The merged list of unique articles
+    """
+    seen_urls = set()
+    seen_titles = set()
+    # Titles of the articles seen so far, with the suffix taken for a publisher dropped
+    seen_stripped_titles = set()
+    merged = []
+    for round_of_articles in zip_longest(*results):
+        for article in round_of_articles:
+            if article is None:
+                continue
+
+            url = normalize_url(article.URL)
+            title = normalize_title(article.title, strip_publisher=False)
+            stripped_title = normalize_title(article.title)
+            if url in seen_urls:
+                continue
+            if title and (
+                title in seen_titles
+                or title in seen_stripped_titles
+                or stripped_title in seen_titles
+            ):
+                continue
+            seen_urls.add(url)
+            seen_titles.add(title)
+            if stripped_title != title:
+                seen_stripped_titles.add(stripped_title)
+            merged.append(article)
+
+    return merged[:max_num_articles]
@@ -37,7 +37,12 @@ class GoogleNewsBackend(NewsBackend):
                 NewsArticle(
                     title=article["title"],
                     URL=article["link"],
-                    last_updated=article["date"],
+                    # Prefer the date GoogleNews parsed itself, if it could
+                    last_updated=(
+                        article["datetime"]
+                        if isinstance(article.get("datetime"), datetime)
+                        else article["date"]
+                    ),
                     relevancy_score=0,
                 )
             )
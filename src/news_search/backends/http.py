@@ -0,0 +1,127 @@
+import time
+import random
+import logging
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying, since the same request may succeed a bit later
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter, allowing bursts of up to capacity requests and
+    refilling at a constant rate afterwards.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Args:
+            rate : Number of requests allowed per second on average
+            capacity : Number of requests that may be sent at once
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Rate must be positive and capacity at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """
+        Take a token from the bucket, waiting until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Create a session that keeps up to pool_size connections per host alive.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def request_with_retries(
+    session: requests.Session,
+    method: str,
+    url: str,
+    rate_limiter: TokenBucket = None,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 30,
+    timeout: float = 10,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request, retrying connection errors, timeouts and transient status codes
+    with exponential backoff and full jitter.
+
+    Args:
+        session : Session to send the request with
+        method : HTTP method of the request
+        url : URL of the request
+        rate_limiter : Bucket to take a token from before every attempt
+        max_retries : Number of retries after the first attempt
+        backoff : Seconds to wait before the first retry, doubled for every further retry
+        max_backoff : Maximum number of seconds to wait between attempts
+        timeout : Seconds to wait for the server to connect and to respond
+        kwargs : Further arguments passed on to session.request
+
+    Returns:
+        The successful response
+
+    Raises:
+        requests.HTTPError: If the last attempt returned an error status
+        requests.RequestException: If the last attempt failed to connect or timed out
+    """
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        retry_after = None
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as error:
+            if attempt == max_retries:
+                raise
+            reason = error
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                response.raise_for_status()
+                return response
+            reason = f"status {response.status_code}"
+            retry_after = _retry_after(response)
+
+        delay = random.uniform(0, min(max_backoff, backoff * 2**attempt))
+        if retry_after is not None:
+            delay = min(max(delay, retry_after), max_backoff)
+        logger.info("Retrying %s %s in %.2fs after %s", method, url, delay, reason)
+        time.sleep(delay)
+
+
+def _retry_after(response: requests.Response):
+    # Servers may say how long to back off, but only the seconds form is supported
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
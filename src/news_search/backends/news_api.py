@@ -1,19 +1,61 @@
 from typing import Dict, List
 from datetime import date, datetime
 
-import requests
-from newsapi import NewsApiClient
-
+from news_search.backends.http import (
+    TokenBucket,
+    create_session,
+    request_with_retries,
+)
 from news_search.backends.news_backend import Language, NewsArticle, NewsBackend
 
+NEWSAPI_URL = "https://newsapi.org/v2"
+
 
 class NewsApiBackend(NewsBackend):
     """
-    Class to implement NewsApiClient to scrape recent news articles.
+    Class to implement the NewsAPI to scrape recent news articles.
+
+    Requests go through a long-lived pooled session, are rate limited on the
+    client side to stay within the quota of the NewsAPI plan, and transient
+    errors such as 429 responses are retried with exponential backoff.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = 10,
+        requests_per_second: float = 1,
+        burst: int = 5,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        timeout: float = 10,
+        base_url: str = NEWSAPI_URL,
+    ):
+        """
+        Args:
+            api_key : Key to authenticate with the NewsAPI
+            pool_size : Number of connections to keep open
+            requests_per_second : Average number of requests allowed per second
+            burst : Number of requests that may be sent at once
+            max_retries : Number of retries for transient errors
+            backoff : Seconds to wait before the first retry, doubled for every further retry
+            max_backoff : Maximum number of seconds to wait between retries
+            timeout : Seconds to wait for the NewsAPI to connect and to respond
+            base_url : URL of the NewsAPI, e.g. to use a local stand-in
+        """
         self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.session = create_session(pool_size)
+        self.session.headers["X-Api-Key"] = api_key
+
+    def close(self):
+        self.session.close()
 
     @staticmethod
     def get_required_args() -> Dict[str, str]:
@@ -32,28 +74,34 @@ class NewsApiBackend(NewsBackend):
         updated_after: datetime,
         language: Language,
     ) -> List[NewsArticle]:
-        # Start a session using the api key, and grab everything since we want to sort by relevancy
-        with requests.Session() as session:
-            api = NewsApiClient(self.api_key, session)
-            all_results = api.get_everything(
-                q=topic,
-                language=language,
-                from_param=updated_after,
-                to=date.today(),
-                sort_by="relevancy",
-            )
+        # Grab everything using the shared session, since we want to sort by relevancy
+        response = request_with_retries(
+            self.session,
+            "GET",
+            f"{self.base_url}/everything",
+            rate_limiter=self.rate_limiter,
+            max_retries=self.max_retries,
+            backoff=self.backoff,
+            max_backoff=self.max_backoff,
+            timeout=self.timeout,
+            params={
+                "q": topic,
+                "language": Language(language).value,
+                "from": updated_after.isoformat(timespec="seconds"),
+                "to": date.today().isoformat(),
+                "sortBy": "relevancy",
+            },
+        )
+
+        list_of_articles = response.json()["articles"]
 
-            list_of_articles = all_results["articles"]
-
-            articles = []
-            for article in list_of_articles[:max_num_articles]:
-                title = article.get("title")
-                URL = article.get("url")
-                last_updated = article.get("publishedAt")
-                relevancy_score = 0
-                if title and URL and last_updated:
-                    articles.append(
-                        NewsArticle(title, URL, last_updated, relevancy_score)
-                    )
+        articles = []
+        for article in list_of_articles[:max_num_articles]:
+            title = article.get("title")
+            URL = article.get("url")
+            last_updated = article.get("publishedAt")
+            relevancy_score = 0
+            if title and URL and last_updated:
+                articles.append(NewsArticle(title, URL, last_updated, relevancy_score))
 
         return articles
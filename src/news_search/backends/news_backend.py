@@ -1,9 +1,15 @@
 from abc import ABCMeta, abstractmethod
 from enum import Enum
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
+from news_search.instrumentation import Instrumentation, instrumentation
+from news_search.backends.normalize import parse_timestamp
+
+if TYPE_CHECKING:
+    from news_search.backends.cache import BackendCache
+
 
 class Language(str, Enum):
     """
@@ -14,7 +20,7 @@ class Language(str, Enum):
     german = "de"
 
 
-@dataclass
+@dataclass(slots=True)
 class NewsArticle:
     """
     Struct for desired news article query result
@@ -22,8 +28,11 @@ class NewsArticle:
 
     title: str
     URL: str
-    last_updated: datetime
+    # Publication date, None if the backend did not report a readable one
+    last_updated: Optional[datetime]
     relevancy_score: float
+    # Number of near duplicate articles this article stands for, including itself
+    duplicate_count: int = 1
 
 
 class NewsBackend(metaclass=ABCMeta):
@@ -31,6 +40,11 @@ class NewsBackend(metaclass=ABCMeta):
     Entity performing webscraping for recent articles on a freetext topic.
     """
 
+    # Optional response cache in front of fetch_for_topic, see BackendCache
+    cache: Optional["BackendCache"] = None
+    # Receives timings and error counts of fetch_for_topic, see Instrumentation
+    instrumentation: Instrumentation = instrumentation
+
     @staticmethod
     def get_required_args() -> Dict[str, str]:
         """
@@ -78,10 +92,68 @@ class NewsBackend(metaclass=ABCMeta):
         if len(topic) > 1e3:
             raise ValueError("Query is too long.")
 
+        labels = {"backend": type(self).__name__}
+        try:
+            with self.instrumentation.timer("backend_fetch", **labels):
+                articles = self._fetch_cached(
+                    topic, max_num_articles, updated_after, language
+                )
+        except Exception as error:
+            self.instrumentation.count(
+                "backend_errors", error=type(error).__name__, **labels
+            )
+            raise
+        self.instrumentation.count("backend_articles", len(articles), **labels)
+        return articles
+
+    def _fetch_cached(
+        self,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> List[NewsArticle]:
+        if self.cache is None:
+            return self._fetch_normalized(
+                topic, max_num_articles, updated_after, language
+            )
+
+        # only go to the web if the same query has not been answered recently
+        key = self.cache.make_key(
+            self, topic, max_num_articles, updated_after, language
+        )
+        articles = self.cache.get(key)
+        if articles is None:
+            self.instrumentation.count("cache_misses", backend=type(self).__name__)
+            articles = self._fetch_normalized(
+                topic, max_num_articles, updated_after, language
+            )
+            self.cache.put(key, articles)
+        else:
+            self.instrumentation.count("cache_hits", backend=type(self).__name__)
+        return articles
+
+    def _fetch_normalized(
+        self,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> List[NewsArticle]:
         # delegate to implementations after arg checks:
-        return self._fetch_for_topic(
+        articles = self._fetch_for_topic(
             topic=topic,
             max_num_articles=max_num_articles,
             updated_after=updated_after,
             language=language,
         )
+
+        # Backends report publication dates as whatever their source returns,
+        # parse them right away, while relative dates still refer to now
+        now = datetime.now()
+        for article in articles:
+            if not isinstance(article.last_updated, datetime):
+                article.last_updated = parse_timestamp(article.last_updated, now)
+            elif article.last_updated.tzinfo is not None:
+                article.last_updated = parse_timestamp(article.last_updated)
+        return articles
@@ -0,0 +1,145 @@
+import re
+import math
+import unicodedata
+from typing import Optional
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+
+# Query parameters only used for tracking, which do not change the linked article
+TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "ved", "usg", "cmpid", "smid"}
+
+# A trailing " - Publisher" or " | Publisher" as some backends append to titles
+PUBLISHER_SUFFIX = re.compile(r"\s+[-|–—]\s+(\S+\s*){1,3}$")
+NON_WORD = re.compile(r"[\W_]+")
+
+# Relative publication dates as GoogleNews reports them, in English and German
+RELATIVE_DATE = re.compile(
+    r"^(?:vor\s+)?(?:(\d+)|an?|eine[mn]?)\s+([a-zä]+)(?:\s+ago)?$", re.IGNORECASE
+)
+TIME_UNITS = {
+    "min": timedelta(minutes=1),
+    "mins": timedelta(minutes=1),
+    "minute": timedelta(minutes=1),
+    "minutes": timedelta(minutes=1),
+    "minuten": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "hours": timedelta(hours=1),
+    "stunde": timedelta(hours=1),
+    "stunden": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "days": timedelta(days=1),
+    "tag": timedelta(days=1),
+    "tagen": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "weeks": timedelta(weeks=1),
+    "woche": timedelta(weeks=1),
+    "wochen": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "months": timedelta(days=30),
+    "monat": timedelta(days=30),
+    "monaten": timedelta(days=30),
+}
+RELATIVE_DAYS = {"today": 0, "heute": 0, "yesterday": 1, "gestern": 1}
+
+# Absolute date formats seen in backend responses, tried in this order
+DATE_FORMATS = [
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%d.%m.%Y",
+    "%m/%d/%Y",
+    "%Y-%m-%d %H:%M:%S",
+]
+# Formats without a year, which is taken to be the most recent one possible
+DATE_FORMATS_WITHOUT_YEAR = ["%b %d", "%d %b", "%d.%m."]
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize an article URL, so links to the same article compare equal.
+
+    Lowercases scheme and host, drops "www.", fragments, tracking parameters
+    and trailing slashes, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(sorted(query)), ""))
+
+
+def normalize_title(title: str, strip_publisher: bool = True) -> str:
+    """
+    Normalize an article title, so syndicated copies of a headline compare equal.
+
+    Drops case, punctuation, repeated whitespace and, if strip_publisher is set,
+    a trailing publisher name. The latter is a guess, anything after a final
+    " - " of up to three words counts as publisher.
+    """
+    title = unicodedata.normalize("NFKC", title).strip()
+    if strip_publisher:
+        title = PUBLISHER_SUFFIX.sub("", title)
+    return NON_WORD.sub(" ", title.casefold()).strip()
+
+
+def parse_timestamp(value, now: datetime = None) -> Optional[datetime]:
+    """
+    Turn a publication date as reported by a backend into a naive local datetime.
+
+    Understands datetimes, dates, seconds since the epoch, ISO 8601 strings
+    (including a trailing Z), relative dates such as "3 hours ago" or
+    "vor 2 Tagen", and a few common absolute formats such as "Mar 5, 2024".
+    Timezone aware dates are converted to local time.
+
+    Args:
+        value : The date to parse
+        now : Reference point of relative dates, the current time if not given
+
+    Returns:
+        The parsed date, or None if it is missing or cannot be parsed
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value) if math.isfinite(value) else None
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    text = " ".join(value.split())
+    if now is None:
+        now = datetime.now()
+
+    try:
+        return parse_timestamp(datetime.fromisoformat(re.sub(r"Z$", "+00:00", text)))
+    except ValueError:
+        pass
+
+    lowered = text.lower()
+    if lowered in RELATIVE_DAYS:
+        return now - timedelta(days=RELATIVE_DAYS[lowered])
+    match = RELATIVE_DATE.match(lowered)
+    if match and match.group(2) in TIME_UNITS:
+        amount = int(match.group(1)) if match.group(1) else 1
+        return now - amount * TIME_UNITS[match.group(2)]
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            pass
+    for date_format in DATE_FORMATS_WITHOUT_YEAR:
+        try:
+            parsed = datetime.strptime(f"{text} {now.year}", f"{date_format} %Y")
+        except ValueError:
+            continue
+        return parsed if parsed <= now else parsed.replace(year=now.year - 1)
+    return None
@@ -0,0 +1,269 @@
+import time
+import sqlite3
+from typing import Dict, List, Union, Optional
+from pathlib import Path
+from datetime import datetime
+from threading import Lock
+
+from news_search.backends.normalize import (
+    normalize_url,
+    normalize_title,
+    parse_timestamp,
+)
+from news_search.backends.news_backend import Language, NewsArticle, NewsBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    normalized_url TEXT UNIQUE NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    last_updated TEXT,
+    published REAL NOT NULL,
+    language TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE TABLE IF NOT EXISTS topic_articles (
+    topic TEXT NOT NULL,
+    language TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    PRIMARY KEY (topic, language, article_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    PRIMARY KEY (token, article_id)
+) WITHOUT ROWID;
+"""
+
+
+class ArticleStore:
+    """
+    Local SQLite store of all fetched articles, with an inverted index over the
+    tokens of their titles for offline search.
+    """
+
+    def __init__(self, path: Union[str, Path] = "results/articles.sqlite"):
+        """
+        Args:
+            path : Path to the SQLite database, created if it does not exist
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        # A single connection shared by all threads, guarded by our own lock
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def add(self, topic: str, language: Language, articles: List[NewsArticle]) -> int:
+        """
+        Store articles fetched for a topic, ignoring articles stored before.
+
+        Args:
+            topic : Topic the articles were fetched for
+            language : Language the articles were fetched in
+            articles : A list of NewsArticle objects
+
+        Returns:
+            The number of articles that were not stored yet
+        """
+        language = Language(language).value
+        fetched_at = time.time()
+        num_new = 0
+        with self._lock, self._connection:
+            for article in articles:
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO articles (normalized_url, url, title, "
+                    "last_updated, published, language, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        normalize_url(article.URL),
+                        article.URL,
+                        article.title,
+                        _as_text(article.last_updated),
+                        _as_timestamp(article.last_updated, fetched_at),
+                        language,
+                        fetched_at,
+                    ),
+                )
+                if cursor.rowcount:
+                    article_id = cursor.lastrowid
+                    num_new += 1
+                    self._connection.executemany(
+                        "INSERT OR IGNORE INTO postings (token, article_id) VALUES (?, ?)",
+                        [(token, article_id) for token in _tokenize(article.title)],
+                    )
+                else:
+                    (article_id,) = self._connection.execute(
+                        "SELECT id FROM articles WHERE normalized_url = ?",
+                        (normalize_url(article.URL),),
+                    ).fetchone()
+
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO topic_articles (topic, language, article_id) "
+                    "VALUES (?, ?, ?)",
+                    (topic, language, article_id),
+                )
+        return num_new
+
+    def latest(self, topic: str, language: Language) -> Optional[datetime]:
+        """
+        Return the publication date of the newest article stored for a topic.
+        """
+        with self._lock:
+            (published,) = self._connection.execute(
+                "SELECT MAX(published) FROM articles JOIN topic_articles "
+                "ON articles.id = topic_articles.article_id "
+                "WHERE topic = ? AND topic_articles.language = ?",
+                (topic, Language(language).value),
+            ).fetchone()
+        return datetime.fromtimestamp(published) if published is not None else None
+
+    def articles_for_topic(
+        self,
+        topic: str,
+        language: Language,
+        updated_after: datetime = None,
+        max_num_articles: int = None,
+    ) -> List[NewsArticle]:
+        """
+        Return the stored articles of a topic, newest first.
+
+        Args:
+            topic : Topic the articles were fetched for
+            language : Language the articles were fetched in
+            updated_after : Only return articles published after this date
+            max_num_articles : The total number of articles to return, all if not given
+        """
+        query = (
+            "SELECT title, url, last_updated FROM articles JOIN topic_articles "
+            "ON articles.id = topic_articles.article_id "
+            "WHERE topic = ? AND topic_articles.language = ? AND published >= ? "
+            "ORDER BY published DESC, articles.id LIMIT ?"
+        )
+        after = updated_after.timestamp() if updated_after is not None else 0
+        limit = max_num_articles if max_num_articles is not None else -1
+        with self._lock:
+            rows = self._connection.execute(
+                query, (topic, Language(language).value, after, limit)
+            ).fetchall()
+        return [
+            NewsArticle(title, url, parse_timestamp(last_updated), 0)
+            for title, url, last_updated in rows
+        ]
+
+    def search(
+        self, query: str, language: Language = None, limit: int = 20
+    ) -> List[NewsArticle]:
+        """
+        Search all stored articles offline for titles containing the query tokens.
+
+        Articles matching more tokens of the query come first, then newer articles.
+
+        Args:
+            query : Freetext query
+            language : Only return articles in this language, all languages if not given
+            limit : The total number of articles to return
+
+        Returns:
+            A list of NewsArticle objects, with the share of matched tokens as relevancy score
+        """
+        tokens = list(dict.fromkeys(_tokenize(query)))
+        if not tokens:
+            return []
+
+        placeholders = ", ".join("?" for _ in tokens)
+        conditions = f"token IN ({placeholders})"
+        parameters: list = list(tokens)
+        if language is not None:
+            conditions += " AND language = ?"
+            parameters.append(Language(language).value)
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT title, url, last_updated, COUNT(*) AS matches "
+                "FROM postings JOIN articles ON articles.id = postings.article_id "
+                f"WHERE {conditions} GROUP BY articles.id "
+                "ORDER BY matches DESC, published DESC LIMIT ?",
+                parameters + [limit],
+            ).fetchall()
+        return [
+            NewsArticle(
+                title, url, parse_timestamp(last_updated), matches / len(tokens)
+            )
+            for title, url, last_updated, matches in rows
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (num_articles,) = self._connection.execute(
+                "SELECT COUNT(*) FROM articles"
+            ).fetchone()
+            (num_topics,) = self._connection.execute(
+                "SELECT COUNT(DISTINCT topic) FROM topic_articles"
+            ).fetchone()
+        return {"articles": num_articles, "topics": num_topics}
+
+
+class StoredBackend(NewsBackend):
+    """
+    Class to keep the articles of another backend in an ArticleStore, and only
+    fetch articles newer than the ones already stored for a topic.
+    """
+
+    def __init__(self, backend: NewsBackend, store: ArticleStore):
+        self.backend = backend
+        self.store = store
+
+    @staticmethod
+    def get_required_args() -> Dict[str, str]:
+        return {}
+
+    def _fetch_for_topic(
+        self,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> List[NewsArticle]:
+        # Only ask the backend for what is newer than the newest stored article
+        fetch_after = updated_after
+        latest = self.store.latest(topic, language)
+        if latest is not None:
+            fetch_after = min(max(updated_after, latest), datetime.now())
+
+        articles = self.backend.fetch_for_topic(
+            topic, max_num_articles, fetch_after, language
+        )
+        self.store.add(topic, language, articles)
+
+        return self.store.articles_for_topic(
+            topic, language, updated_after, max_num_articles
+        )
+
+
+def _tokenize(text: str) -> List[str]:
+    return normalize_title(text).split()
+
+
+def _as_text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _as_timestamp(value, default: float) -> float:
+    # Articles stored before publication dates were parsed by the backends may
+    # hold anything, use the fetch time for anything that is not a proper date
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return default
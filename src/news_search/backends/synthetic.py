@@ -0,0 +1,173 @@
+import random
+import hashlib
+from typing import Dict, List
+from datetime import datetime
+
+from news_search.backends.news_backend import Language, NewsArticle, NewsBackend
+
+# Building blocks for the synthetic headlines of each language
+HEADLINE_PARTS = {
+    Language.english: {
+        "templates": [
+            "{person} meets {org} leaders in {place} to discuss {subject}",
+            "{org} warns of {subject} as {person} visits {place}",
+            "{place} braces for {subject} after {org} report",
+            "{person} criticizes {org} over {subject}",
+            "Markets react as {org} announces plans for {subject} in {place}",
+            "{subject}: what {person} said in {place}",
+        ],
+        "person": [
+            "Joe Biden",
+            "Olaf Scholz",
+            "Emmanuel Macron",
+            "Taylor Swift",
+            "Elon Musk",
+            "Christine Lagarde",
+            "Rishi Sunak",
+            "Greta Thunberg",
+        ],
+        "org": [
+            "Google",
+            "the European Union",
+            "NATO",
+            "Apple",
+            "the United Nations",
+            "Volkswagen",
+            "the IMF",
+            "Microsoft",
+        ],
+        "place": [
+            "Berlin",
+            "Washington",
+            "Paris",
+            "London",
+            "Brussels",
+            "Tokyo",
+            "New York",
+            "Munich",
+        ],
+        "subject": [
+            "climate change",
+            "rising inflation",
+            "energy prices",
+            "artificial intelligence",
+            "the election",
+            "trade tariffs",
+            "housing costs",
+            "the heat wave",
+        ],
+    },
+    Language.german: {
+        "templates": [
+            "{person} trifft {org} in {place} und spricht über {subject}",
+            "{org} warnt vor {subject}, während {person} {place} besucht",
+            "{place} rechnet nach Bericht von {org} mit {subject}",
+            "{person} kritisiert {org} wegen {subject}",
+            "Börsen reagieren: {org} plant {subject} in {place}",
+            "{subject}: Was {person} in {place} gesagt hat",
+        ],
+        "person": [
+            "Olaf Scholz",
+            "Angela Merkel",
+            "Annalena Baerbock",
+            "Christian Lindner",
+            "Robert Habeck",
+            "Ursula von der Leyen",
+            "Markus Söder",
+            "Friedrich Merz",
+        ],
+        "org": [
+            "die Bundesregierung",
+            "die Europäische Union",
+            "Siemens",
+            "die Deutsche Bahn",
+            "die Bundesbank",
+            "Volkswagen",
+            "die NATO",
+            "die Vereinten Nationen",
+        ],
+        "place": [
+            "Berlin",
+            "München",
+            "Hamburg",
+            "Brüssel",
+            "Frankfurt",
+            "Köln",
+            "Paris",
+            "Wien",
+        ],
+        "subject": [
+            "den Klimawandel",
+            "die Inflation",
+            "hohe Energiepreise",
+            "künstliche Intelligenz",
+            "die Wahl",
+            "neue Zölle",
+            "steigende Mieten",
+            "die Hitzewelle",
+        ],
+    },
+}
+
+
+class SyntheticBackend(NewsBackend):
+    """
+    Class to generate deterministic synthetic news articles offline, e.g. for
+    benchmarks. The same query always returns the same articles.
+    """
+
+    def __init__(self, duplicate_rate: float = 0.1, seed: int = 0):
+        """
+        Args:
+            duplicate_rate : Share of articles repeating an earlier headline, as
+                syndicated stories do
+            seed : Seed to generate different but still deterministic articles
+        """
+        self.duplicate_rate = duplicate_rate
+        self.seed = seed
+
+    @staticmethod
+    def get_required_args() -> Dict[str, str]:
+        return {}
+
+    def _fetch_for_topic(
+        self,
+        topic: str,
+        max_num_articles: int,
+        updated_after: datetime,
+        language: Language,
+    ) -> List[NewsArticle]:
+        language = Language(language)
+        parts = HEADLINE_PARTS[language]
+        # Seed with a stable hash, since Python's hash() of strings changes per process
+        seed_text = f"{self.seed}:{language.value}:{topic}"
+        rng = random.Random(hashlib.sha256(seed_text.encode()).digest())
+
+        window = max((datetime.now() - updated_after).total_seconds(), 0)
+        articles = []
+        for index in range(max_num_articles):
+            if articles and rng.random() < self.duplicate_rate:
+                title = rng.choice(articles).title
+            else:
+                template = rng.choice(parts["templates"])
+                title = template.format(
+                    **{
+                        part: rng.choice(parts[part])
+                        for part in ("person", "org", "place", "subject")
+                    }
+                )
+                # Mix the topic into some headlines, so relevance scores differ
+                if rng.random() < 0.3:
+                    title = f"{topic}: {title}"
+                title = title[0].upper() + title[1:]
+
+            published = updated_after.timestamp() + rng.random() * window
+            articles.append(
+                NewsArticle(
+                    title=title,
+                    URL=f"https://news.example.com/{language.value}/{index}",
+                    last_updated=datetime.fromtimestamp(published),
+                    relevancy_score=0,
+                )
+            )
+        return articles
@@ -0,0 +1,125 @@
+import hashlib
+from typing import Dict, List
+
+from news_search.backends import NewsArticle
+from news_search.backends.normalize import normalize_title
+
+# Number of bits of a SimHash fingerprint
+SIMHASH_BITS = 64
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64 bit SimHash of a text over its words and word bigrams.
+
+    Texts sharing most of their words get fingerprints that differ in only a
+    few bits, so near duplicates can be found by their Hamming distance.
+    """
+    words = text.split()
+    features = words + [" ".join(pair) for pair in zip(words, words[1:])]
+    if not features:
+        return 0
+
+    import numpy as np
+
+    digests = b"".join(
+        hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        for feature in features
+    )
+    # Each bit of the fingerprint is set if most feature hashes have it set
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(
+        -1, SIMHASH_BITS
+    )
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def group_near_duplicates(titles: List[str], max_distance: int = 3) -> List[List[int]]:
+    """
+    Group titles whose SimHash fingerprints differ in at most max_distance bits
+    from the first title of their group.
+
+    Titles join the group of the earliest group leader within the distance, or
+    lead a new group. Titles are not chained together, so two members of a group
+    differ in at most twice max_distance bits.
+
+    Fingerprints are split into max_distance + 1 bands, and two fingerprints
+    within the distance must agree on at least one band. So only leaders sharing
+    a band with a title are compared, which keeps the grouping roughly linear in
+    the number of titles.
+
+    Args:
+        titles : The titles to group
+        max_distance : Maximum number of differing bits between a title and the
+            first title of its group
+
+    Returns:
+        Groups of indices into titles, in order of their first member
+    """
+    # Identical fingerprints are grouped right away, only distinct ones are compared
+    members: Dict[int, List[int]] = {}
+    for index, title in enumerate(titles):
+        members.setdefault(simhash(normalize_title(title)), []).append(index)
+
+    num_bands = max_distance + 1
+    band_width = -(-SIMHASH_BITS // num_bands)
+    band_mask = (1 << band_width) - 1
+
+    def band_keys(fingerprint: int) -> List[int]:
+        return [
+            fingerprint >> (band * band_width) & band_mask for band in range(num_bands)
+        ]
+
+    # Fingerprint of each group's leader, and the leaders by band and key
+    leaders: List[int] = []
+    bands: List[Dict[int, List[int]]] = [{} for _ in range(num_bands)]
+    groups: List[List[int]] = []
+    for fingerprint, indices in members.items():
+        keys = band_keys(fingerprint)
+        candidates = {
+            leader
+            for band, key in enumerate(keys)
+            for leader in bands[band].get(key, [])
+        }
+        # Leaders are numbered in order, so the earliest one within the distance wins
+        for leader in sorted(candidates):
+            if (leaders[leader] ^ fingerprint).bit_count() <= max_distance:
+                groups[leader].extend(indices)
+                break
+        else:
+            for band, key in enumerate(keys):
+                bands[band].setdefault(key, []).append(len(leaders))
+            leaders.append(fingerprint)
+            groups.append(list(indices))
+
+    return [sorted(group) for group in groups]
+
+
+def drop_near_duplicates(
+    articles: List[NewsArticle], max_distance: int = 3
+) -> List[NewsArticle]:
+    """
+    Keep one article per group of near duplicate titles.
+
+    The first article of each group is kept, and its duplicate_count is set to
+    the number of articles it stands for.
+
+    Args:
+        articles : A list of NewsArticle objects
+        max_distance : Maximum number of differing SimHash bits between near duplicates
+
+    Returns:
+        The representative articles, in their original order
+    """
+    groups = group_near_duplicates(
+        [article.title for article in articles], max_distance
+    )
+
+    representatives = []
+    for group in groups:
+        representative = articles[group[0]]
+        representative.duplicate_count = sum(
+            articles[index].duplicate_count for index in group
+        )
+        representatives.append(representative)
+    return representatives
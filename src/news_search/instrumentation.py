@@ -0,0 +1,193 @@
+import json
+import time
+from typing import IO, Callable, Dict, List, Tuple, Union
+from pathlib import Path
+from threading import Lock
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+
+# Returned by timers while no hook is registered, so timing costs next to nothing
+_DISABLED_TIMER = nullcontext()
+
+
+@dataclass
+class MetricEvent:
+    """
+    Struct for a single measurement passed on to the hooks
+    """
+
+    # Either "timing" (value in seconds) or "count"
+    kind: str
+    name: str
+    value: float
+    labels: Dict[str, str] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+
+class Instrumentation:
+    """
+    Hub passing timings and counters of the hot paths on to registered hooks.
+
+    Without hooks, timers and counters return right away, so instrumented code
+    runs at practically the same speed as uninstrumented code.
+    """
+
+    def __init__(self):
+        self._hooks: List[Callable[[MetricEvent], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._hooks)
+
+    def add_hook(self, hook: Callable[[MetricEvent], None]):
+        """
+        Register a callable to receive every MetricEvent.
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[MetricEvent], None]):
+        self._hooks.remove(hook)
+
+    def timer(self, name: str, **labels: str):
+        """
+        Context manager measuring the wall time of its body as a timing event.
+
+        Args:
+            name : Name of the timed stage
+            labels : Further labels of the event, such as the language or backend
+        """
+        if not self._hooks:
+            return _DISABLED_TIMER
+        return _Timer(self, name, labels)
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        """
+        Emit a counter event, such as the number of processed articles.
+
+        Args:
+            name : Name of the counter
+            value : Amount to increase the counter by
+            labels : Further labels of the event, such as the language or backend
+        """
+        if self._hooks:
+            self.emit(MetricEvent("count", name, value, labels))
+
+    def emit(self, event: MetricEvent):
+        for hook in self._hooks:
+            hook(event)
+
+
+class _Timer:
+    def __init__(self, instrumentation: Instrumentation, name: str, labels: dict):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self.start
+        labels = self.labels
+        if exc_type is not None:
+            labels = {**labels, "error": exc_type.__name__}
+        self.instrumentation.emit(MetricEvent("timing", self.name, duration, labels))
+
+
+class JsonLinesExporter:
+    """
+    Hook writing every event as one line of JSON.
+    """
+
+    def __init__(self, output: Union[str, Path, IO[str]]):
+        """
+        Args:
+            output : Path of the file to append to, or an open text stream
+        """
+        if isinstance(output, (str, Path)):
+            Path(output).parent.mkdir(exist_ok=True, parents=True)
+            self._stream = open(output, "a")
+            self._owns_stream = True
+        else:
+            self._stream = output
+            self._owns_stream = False
+        self._lock = Lock()
+
+    def __call__(self, event: MetricEvent):
+        line = json.dumps(asdict(event)) + "\n"
+        with self._lock:
+            self._stream.write(line)
+            self._stream.flush()
+
+    def close(self):
+        if self._owns_stream:
+            self._stream.close()
+
+
+class PrometheusExporter:
+    """
+    Hook aggregating events into counters, rendered in the Prometheus text format.
+
+    Timings become a total duration and a number of observations per stage,
+    counts become a running total.
+    """
+
+    def __init__(self, prefix: str = "news_search"):
+        self.prefix = prefix
+        self._durations: Dict[Tuple[str, tuple], List[float]] = {}
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._lock = Lock()
+
+    def __call__(self, event: MetricEvent):
+        key = (event.name, tuple(sorted(event.labels.items())))
+        with self._lock:
+            if event.kind == "timing":
+                total = self._durations.setdefault(key, [0.0, 0])
+                total[0] += event.value
+                total[1] += 1
+            else:
+                self._counters[key] = self._counters.get(key, 0) + event.value
+
+    def render(self) -> str:
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            if self._durations:
+                metric = f"{self.prefix}_stage_duration_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for (name, labels), (total, count) in sorted(self._durations.items()):
+                    label_str = _format_labels((("stage", name),) + labels)
+                    lines.append(f"{metric}_sum{label_str} {total}")
+                    lines.append(f"{metric}_count{label_str} {count}")
+
+            for name in sorted({name for name, _ in self._counters}):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter, labels), value in sorted(self._counters.items()):
+                    if counter == name:
+                        lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]):
+        """
+        Write all metrics to a file, e.g. for the textfile collector of node_exporter.
+        """
+        Path(path).parent.mkdir(exist_ok=True, parents=True)
+        Path(path).write_text(self.render())
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+# Shared instrumentation used by all scrapers and backends unless told otherwise
+instrumentation = Instrumentation()
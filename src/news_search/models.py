@@ -0,0 +1,98 @@
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from news_search.backends import Language
+
+if TYPE_CHECKING:
+    from spacy.language import Language as SpacyLanguage
+
+# Default spacy models to use for each supported language
+MODEL_NAMES = {
+    Language.english: "en_core_web_md",
+    Language.german: "de_core_news_md",
+}
+
+# Short text pushed through freshly loaded models, so that lazily initialized
+# parts of the pipeline are set up before the first real query arrives
+WARM_UP_TEXT = {
+    Language.english: "The quick brown fox jumps over the lazy dog in Berlin.",
+    Language.german: "Der schnelle braune Fuchs springt in Berlin über den faulen Hund.",
+}
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded spacy models, keyed by language.
+
+    Loading a model takes several seconds and hundreds of MB, so each model is
+    loaded at most once and then shared by everyone asking for that language.
+    """
+
+    def __init__(self, model_names: Optional[Dict[Language, str]] = None):
+        self.model_names = dict(MODEL_NAMES if model_names is None else model_names)
+        self._models: Dict[Language, "SpacyLanguage"] = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # Only the model names are sent to other processes, which load the models themselves
+        return {"model_names": self.model_names}
+
+    def __setstate__(self, state):
+        self.__init__(state["model_names"])
+
+    def get(self, language: Language) -> "SpacyLanguage":
+        """
+        Return the model for a language, loading it on first use.
+
+        Args:
+            language : Language of the requested model
+
+        Returns:
+            The loaded spacy model
+        """
+        language = Language(language)
+        model = self._models.get(language)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have loaded the model while we were waiting
+            if language not in self._models:
+                # spacy itself is heavy to import, so only do it once a model is needed
+                import spacy
+
+                self._models[language] = spacy.load(self.model_names[language])
+            return self._models[language]
+
+    def preload(self, languages: Iterable[Language] = None, warm_up: bool = True):
+        """
+        Load models ahead of time, e.g. at startup of a long-running process.
+
+        Args:
+            languages : Languages to load the models for, defaults to all known languages
+            warm_up : Whether to run a short text through each model after loading
+        """
+        for language in languages if languages is not None else self.model_names:
+            nlp = self.get(language)
+            if warm_up:
+                nlp(WARM_UP_TEXT.get(Language(language), "Warm up"))
+
+    def is_loaded(self, language: Language) -> bool:
+        return Language(language) in self._models
+
+    def evict(self, language: Language = None):
+        """
+        Drop loaded models so their memory can be reclaimed.
+
+        Args:
+            language : Language of the model to drop, drops all models if not given
+        """
+        with self._lock:
+            if language is None:
+                self._models.clear()
+            else:
+                self._models.pop(Language(language), None)
+
+
+# Shared registry used by all NewsScraper instances unless told otherwise
+model_registry = ModelRegistry()
@@ -1,15 +1,56 @@
-import csv
-from typing import List, Tuple, Union
-from heapq import nlargest
-from string import punctuation
+import logging
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union, Iterable, Optional
 from pathlib import Path
 from datetime import datetime
-import spacy
-from spacy.lang.de.stop_words import STOP_WORDS as GERMAN_STOPWORDS
-from spacy.lang.en.stop_words import STOP_WORDS as ENGLISH_STOPWORDS
-
+from contextlib import ExitStack
+from dataclasses import field, dataclass
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from news_search.dedup import drop_near_duplicates
+from news_search.models import ModelRegistry, model_registry
+from news_search.pipelines import (
+    PipelineProfile,
+    combine_profiles,
+    parse,
+    resolve_profiles,
+)
+from news_search.trends import TrendTracker
+from news_search.writers import ArticleWriter, create_writer
+from news_search.vector_cache import VectorCache
+from news_search.summarizers import Summarizer, TfIdfSummarizer
+from news_search.instrumentation import Instrumentation, instrumentation
+from news_search.relevance import RelevanceMode, top_k_indices, cosine_similarities
 from news_search.backends import Language, NewsArticle, NewsBackend
 
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.tokens import Doc
+
+# Modules with the stop words to ignore when summarizing, for each supported
+# language. Like spacy itself, they are only imported once they are needed.
+STOPWORD_MODULES = {
+    Language.english: "spacy.lang.en.stop_words",
+    Language.german: "spacy.lang.de.stop_words",
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TopicResult:
+    """
+    Struct for the analysis results of a single topic
+    """
+
+    topic: str
+    articles: List[NewsArticle]
+    summary: str
+    named_entities: List[str]
+    # How often each named entity was mentioned, sorted by frequency
+    entity_counts: Dict[str, int] = field(default_factory=dict)
+
 
 class NewsScraper:
     """
@@ -21,10 +62,38 @@ class NewsScraper:
         backend: NewsBackend,
         save_on_fetch: bool = True,
         language: Language = Language.english,
+        models: ModelRegistry = None,
+        batch_size: int = 64,
+        relevance_mode: RelevanceMode = RelevanceMode.vectorized,
+        near_duplicate_distance: Optional[int] = 3,
+        instrumentation: Instrumentation = instrumentation,
+        pipeline_profiles: Dict[str, PipelineProfile] = None,
+        summarizer: Summarizer = None,
+        trend_tracker: TrendTracker = None,
+        vector_cache: VectorCache = None,
     ):
         self.backend = backend
         self.save_on_fetch = save_on_fetch
         self.language = language
+        # Models are shared across scrapers, so they are only loaded once per process
+        self.models = models if models is not None else model_registry
+        # Number of headlines handed to the spacy pipeline at once
+        self.batch_size = batch_size
+        self.relevance_mode = RelevanceMode(relevance_mode)
+        # Headlines whose SimHash differs in at most this many bits count as the
+        # same story and are only analyzed once, None to keep all of them
+        self.near_duplicate_distance = near_duplicate_distance
+        # Receives the timings and counts of every stage, see Instrumentation
+        self.instrumentation = instrumentation
+        # Pipeline components each stage needs, by stage name, see PipelineProfile.
+        # Stages not given here use the default profiles.
+        self.pipeline_profiles = resolve_profiles(pipeline_profiles)
+        # Engine for the summaries, TF-IDF weighted with statistics kept in memory by default
+        self.summarizer = summarizer if summarizer is not None else TfIdfSummarizer()
+        # Receives the named entities of every query to follow their trends, if given
+        self.trend_tracker = trend_tracker
+        # Persistent cache of headline and query vectors for scoring relevance, if given
+        self.vector_cache = vector_cache
 
     def fetch_summary_and_named_entities(
         self,
@@ -46,36 +115,256 @@ class NewsScraper:
             named_entities : A list of the named entities mentioned in the headlines, sorted by frequency
         """
 
-        # Query the backend and return the 15 most recent/relevant news articles
-        articles = self.backend.fetch_for_topic(
-            topic, max_num_articles, updated_after, self.language
-        )
+        timer = self.instrumentation.timer
+        labels = {"language": Language(self.language).value}
+
+        with timer("query", **labels):
+            # Query the backend and return the 15 most recent/relevant news articles
+            with timer("fetch", **labels):
+                articles = self.backend.fetch_for_topic(
+                    topic, max_num_articles, updated_after, self.language
+                )
+
+            result = self.analyze_articles(topic, articles, max_num_articles)
+
+            # Save articles titles, URLs, and publication dates to a file
+            if self.save_on_fetch:
+                with timer("save_articles", **labels):
+                    self.save_articles(articles=result.articles, outfile=outfile)
+
+        return result.summary, result.named_entities
+
+    def fetch_many(
+        self,
+        topics: Iterable[str],
+        max_num_articles: int,
+        updated_after: datetime,
+        outdir: Union[str, Path] = None,
+        max_fetch_workers: int = 8,
+        n_process: int = 1,
+        outfile: Union[str, Path] = None,
+        append: bool = False,
+        file_format: str = "csv",
+        keep_articles: bool = True,
+    ) -> Dict[str, TopicResult]:
+        """
+        Fetch and analyze the articles of many topics at once.
+
+        Topics are fetched concurrently, and each topic is analyzed as soon as its
+        articles arrive while the remaining topics are still being fetched. With
+        n_process > 1 the analysis runs in that many worker processes.
+
+        Args:
+            topics : Topics to query the web for
+            max_num_articles : The total number of articles to return per topic
+            updated_after : Date after which article must have been modified to ensure recency
+            outdir : Directory to save the articles of each topic to, required if save_on_fetch is set
+            max_fetch_workers : Maximum number of topics fetched at the same time
+            n_process : Number of worker processes for the analysis, 1 to analyze in this process
+            outfile : Single file to stream the articles of all topics to, instead of one file per topic in outdir
+            append : Whether to add to outfile instead of replacing it
+            file_format : Format of the files in outdir, csv, jsonl or parquet
+            keep_articles : Whether to keep the articles in the results, or drop them once saved
+
+        Returns:
+            The results of each topic, topics that failed are logged and left out
+        """
+        topics = list(dict.fromkeys(topics))
+        results: Dict[str, TopicResult] = {}
+
+        with ExitStack() as stack:
+            writer = None
+            if self.save_on_fetch and outfile is not None:
+                writer = stack.enter_context(
+                    create_writer(outfile, append=append, with_topic=True)
+                )
+
+            fetch_pool = stack.enter_context(
+                ThreadPoolExecutor(max_workers=max_fetch_workers)
+            )
+            analysis_pool = None
+            if n_process > 1:
+                # Spawn instead of fork, since the fetching threads are already running
+                analysis_pool = stack.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=n_process,
+                        mp_context=get_context("spawn"),
+                        initializer=_init_analysis_worker,
+                        initargs=(self._analysis_options(),),
+                    )
+                )
+
+            fetches = {
+                fetch_pool.submit(
+                    self.backend.fetch_for_topic,
+                    topic,
+                    max_num_articles,
+                    updated_after,
+                    self.language,
+                ): topic
+                for topic in topics
+            }
+
+            analyses = {}
+            for fetch in as_completed(fetches):
+                topic = fetches[fetch]
+                try:
+                    articles = fetch.result()
+                    if analysis_pool is not None:
+                        analyses[topic] = analysis_pool.submit(
+                            _analyze_in_worker, topic, articles, max_num_articles
+                        )
+                    else:
+                        results[topic] = self.analyze_articles(
+                            topic, articles, max_num_articles
+                        )
+                        self._save_result(
+                            results[topic], writer, outdir, file_format, keep_articles
+                        )
+                except Exception:
+                    logger.exception("Failed to process topic %r", topic)
+
+            for topic, analysis in analyses.items():
+                try:
+                    results[topic], updates = analysis.result()
+                    # Let the summarizer learn from what the worker's copy learned
+                    self.summarizer.apply_updates(updates)
+                    self._track_entities(results[topic])
+                    self._save_result(
+                        results[topic], writer, outdir, file_format, keep_articles
+                    )
+                except Exception:
+                    logger.exception("Failed to analyze topic %r", topic)
+
+        return {topic: results[topic] for topic in topics if topic in results}
+
+    def _save_result(
+        self,
+        result: TopicResult,
+        writer: ArticleWriter = None,
+        outdir: Union[str, Path] = None,
+        file_format: str = "csv",
+        keep_articles: bool = True,
+    ):
+        """
+        Save the articles of a topic as soon as its analysis is done.
+        """
+        if writer is not None:
+            writer.write(result.articles, topic=result.topic)
+        elif self.save_on_fetch:
+            filename = f"{result.topic.replace(' ', '_')}_summary.{file_format}"
+            self.save_articles(articles=result.articles, outfile=Path(outdir) / filename)
+
+        if not keep_articles:
+            result.articles = []
+
+    def analyze_articles(
+        self, topic: str, articles: List[NewsArticle], max_num_articles: int = None
+    ) -> TopicResult:
+        """
+        Rate, summarize and extract the named entities of already fetched articles.
+
+        Args:
+            topic : The query given by the user
+            articles : A list of NewsArticle objects
+            max_num_articles : Number of most relevant articles to keep, all if not given
 
-        # Load the appropriate model and stop words
-        match self.language:
-            case Language.english:
-                nlp = spacy.load("en_core_web_md")
-                stopwords = ENGLISH_STOPWORDS
-            case Language.german:
-                nlp = spacy.load("de_core_news_md")
-                stopwords = GERMAN_STOPWORDS
+        Returns:
+            The relevance sorted articles, their summary and named entities
+        """
+        timer = self.instrumentation.timer
+        count = self.instrumentation.count
+        labels = {"language": Language(self.language).value}
+        count("articles", len(articles), **labels)
+
+        # Syndicated copies of the same story would only skew the statistics below
+        if self.near_duplicate_distance is not None:
+            with timer("drop_near_duplicates", **labels):
+                articles = drop_near_duplicates(articles, self.near_duplicate_distance)
+            count("unique_articles", len(articles), **labels)
+
+        # Get the appropriate model (loaded on first use only) and stop words
+        with timer("model_load", **labels):
+            nlp = self.models.get(self.language)
+        stopwords = load_stopwords(self.language)
+
+        # Run the pipeline over every headline once and share the result between all stages
+        with timer("parse_headlines", **labels):
+            headline_docs = self.parse_headlines(nlp, articles)
+        if self.instrumentation.enabled:
+            count("tokens", sum(len(doc) for doc in headline_docs), **labels)
 
         # Sort the articles based on how relevant they are to the query using spacy's similarity score
-        relevance_sorted_newsarticles = self.rate_relevance(topic, nlp, articles)
+        with timer("rate_relevance", **labels):
+            relevance_sorted_newsarticles = self.rate_relevance(
+                topic, nlp, articles, headline_docs, top_k=max_num_articles
+            )
 
         # Generate a summary based on the headlines of the news articles
-        summarized_articles = self.generate_summary(nlp, stopwords, articles)
+        with timer("generate_summary", **labels):
+            summarized_articles = self.generate_summary(
+                nlp, stopwords, articles, headline_docs
+            )
 
         # Create a list of the entities named in the articles headlines, sorted by frequency
-        sorted_entities = self.return_named_entities(nlp, articles)
+        with timer("return_named_entities", **labels):
+            entity_counts = self.count_named_entities(nlp, articles, headline_docs)
+
+        result = TopicResult(
+            topic=topic,
+            articles=relevance_sorted_newsarticles,
+            summary=summarized_articles,
+            named_entities=list(entity_counts),
+            entity_counts=entity_counts,
+        )
+        self._track_entities(result)
+        return result
+
+    def _track_entities(self, result: TopicResult):
+        if self.trend_tracker is not None:
+            self.trend_tracker.add(result.entity_counts, self.language)
 
-        # Save articles titles, URLs, and publication dates to a csv file
-        if self.save_on_fetch:
-            self.save_articles(articles=relevance_sorted_newsarticles, outfile=outfile)
+    def _analysis_options(self) -> dict:
+        """
+        Arguments to create an equivalent scraper for analysis in another process.
+        """
+        return {
+            "language": self.language,
+            "models": self.models,
+            "batch_size": self.batch_size,
+            "relevance_mode": self.relevance_mode,
+            "near_duplicate_distance": self.near_duplicate_distance,
+            "pipeline_profiles": self.pipeline_profiles,
+            "summarizer": self.summarizer,
+            "vector_cache": self.vector_cache,
+        }
+
+    def parse_headlines(self, nlp, articles: List[NewsArticle]) -> List["Doc"]:
+        """
+        Run the spacy pipeline over all article headlines in batches.
+
+        Only the components needed by the profiles of all stages are run, so that
+        every stage can share the same Docs.
+
+        Args:
+            nlp : The spacy model
+            articles : A list of NewsArticle objects
 
-        return summarized_articles, sorted_entities
+        Returns:
+            A list of spacy Docs, one per article and in the same order
+        """
+        headlines = [article.title for article in articles]
+        profile = combine_profiles(self.pipeline_profiles.values())
+        return parse(nlp, headlines, profile, self.batch_size)
 
-    def rate_relevance(self, topic: str, nlp, articles: List[NewsArticle]):
+    def rate_relevance(
+        self,
+        topic: str,
+        nlp,
+        articles: List[NewsArticle],
+        headline_docs: List["Doc"] = None,
+        top_k: int = None,
+    ):
         """
         Determine the relevance of a news article to the given query.
 
@@ -83,17 +372,25 @@ class NewsScraper:
             topic: The query given by the user
             nlp: The spacy model
             articles : A list of NewsArticle objects
+            headline_docs : The parsed headlines, parsed here if not given
+            top_k : Number of most relevant articles to return, all articles if not given
 
         Returns:
             A list of NewsArticle objects with newly created relevance score, sorted by score
         """
+        if self.relevance_mode == RelevanceMode.vectorized:
+            return self._rate_relevance_vectorized(
+                topic, nlp, articles, headline_docs, top_k
+            )
+
+        if headline_docs is None:
+            headline_docs = self.parse_headlines(nlp, articles)
+
         # Create a spacy Doc to compare the query with the headlines
-        query_doc = nlp(topic)
+        query_doc = parse(nlp, [topic], self.pipeline_profiles["rate_relevance"])[0]
 
-        # Iteratively compare each headline with the query, and save the similarity score
-        for article in articles:
-            headline = article.title
-            headline_doc = nlp(headline)
+        # Compare each headline with the query, and save the similarity score
+        for article, headline_doc in zip(articles, headline_docs):
             similarity_score = headline_doc.similarity(query_doc)
             article.relevancy_score = similarity_score
 
@@ -102,9 +399,85 @@ class NewsScraper:
             articles, key=lambda x: x.relevancy_score, reverse=True
         )
 
-        return relevance_sorted_newsarticles
+        return relevance_sorted_newsarticles[:top_k]
+
+    def _rate_relevance_vectorized(
+        self,
+        topic: str,
+        nlp,
+        articles: List[NewsArticle],
+        headline_docs: List["Doc"] = None,
+        top_k: int = None,
+    ) -> List[NewsArticle]:
+        """
+        Score all headlines against the query at once and select the top k articles.
+        """
+        if not articles:
+            return []
+
+        # Stack the headline vectors into one matrix and score them in one go
+        query_vector = self._relevance_vectors(nlp, [topic])[0]
+        headline_vectors = self._relevance_vectors(
+            nlp, [article.title for article in articles], headline_docs
+        )
+        scores = cosine_similarities(query_vector, headline_vectors)
+        for article, score in zip(articles, scores.tolist()):
+            article.relevancy_score = score
+
+        return [articles[index] for index in top_k_indices(scores, top_k)]
 
-    def generate_summary(self, nlp, stopwords, articles: List[NewsArticle]) -> str:
+    def _relevance_vectors(
+        self, nlp, texts: List[str], docs: List["Doc"] = None
+    ) -> "np.ndarray":
+        """
+        Return the vectors of texts, taken from the vector cache where possible.
+        The remaining texts are parsed, unless their Docs are given, and cached.
+        """
+        import numpy as np
+
+        width = nlp.vocab.vectors_length
+        # Without static vectors, Doc.vector falls back to the model's own tensors
+        use_cache = self.vector_cache is not None and width > 0
+        if use_cache:
+            model = VectorCache.model_name(nlp)
+            vectors, found = self.vector_cache.get(model, texts, width)
+            labels = {"language": Language(self.language).value}
+            self.instrumentation.count("vector_cache_hits", int(found.sum()), **labels)
+            self.instrumentation.count(
+                "vector_cache_misses", int((~found).sum()), **labels
+            )
+            missing = np.flatnonzero(~found).tolist()
+        else:
+            vectors = None
+            missing = list(range(len(texts)))
+
+        if not missing:
+            return vectors
+        if docs is not None:
+            missing_docs = [docs[index] for index in missing]
+        else:
+            missing_docs = parse(
+                nlp,
+                [texts[index] for index in missing],
+                self.pipeline_profiles["rate_relevance"],
+                self.batch_size,
+            )
+        missing_vectors = np.vstack([doc.vector for doc in missing_docs])
+
+        if not use_cache:
+            return missing_vectors
+        vectors[missing] = missing_vectors
+        missing_texts = [texts[index] for index in missing]
+        self.vector_cache.put(model, missing_texts, missing_vectors)
+        return vectors
+
+    def generate_summary(
+        self,
+        nlp,
+        stopwords,
+        articles: List[NewsArticle],
+        headline_docs: List["Doc"] = None,
+    ) -> str:
         """
         Generate a summary from a list of article headlines.
 
@@ -112,64 +485,46 @@ class NewsScraper:
             nlp: The spacy model
             stopwords : The spacy stopwords specific to the query language
             articles : A list of NewsArticle objects
+            headline_docs : The parsed headlines, parsed here if not given
 
         Returns:
             summary : A brief summary of the headlines
         """
-        headlines = [article.title for article in articles]
-        headline_str = " ".join(headlines)
-        headline_doc = nlp(headline_str)
-
-        freq_of_word = dict()
-
-        # Preprocessing
-        for word in headline_doc:
-            if word.text.lower() not in list(stopwords):
-                if word.text.lower() not in punctuation:
-                    if word.text not in freq_of_word.keys():
-                        freq_of_word[word.text] = 1
-                    else:
-                        freq_of_word[word.text] += 1
-
-        # Normalize word frequency
-        max_freq = max(freq_of_word.values())
-        for word in freq_of_word.keys():
-            freq_of_word[word] = freq_of_word[word] / max_freq
-
-        # Sentence weighting
-        sent_tokens = [sent for sent in headline_doc.sents]
-        sent_scores = dict()
-        for sent in sent_tokens:
-            for word in sent:
-                if word.text.lower() in freq_of_word.keys():
-                    if sent not in sent_scores.keys():
-                        sent_scores[sent] = freq_of_word[word.text.lower()]
-                    else:
-                        sent_scores[sent] += freq_of_word[word.text.lower()]
+        if headline_docs is None:
+            headline_docs = self.parse_headlines(nlp, articles)
+        return self.summarizer.summarize(headline_docs, stopwords)
 
-        # Return a selection of the most important headline tokens
-        len_tokens = int(len(sent_tokens) * 0.2)
-        summary = nlargest(n=len_tokens, iterable=sent_scores, key=sent_scores.get)
+    def return_named_entities(
+        self, nlp, articles: List[NewsArticle], headline_docs: List["Doc"] = None
+    ):
+        """
+        Identifies all named entities in article title and returns them in a list sorted by frequency.
 
-        final_summary = [word.text for word in summary]
-        summary = " ".join(final_summary)
+        Args:
+            nlp : The spacy model
+            articles : A list of NewsArticle objects
+            headline_docs : The parsed headlines, parsed here if not given
 
-        return summary
+        Returns:
+            sorted_entities : A list of named entities, sorted by frequency
+        """
+        return list(self.count_named_entities(nlp, articles, headline_docs))
 
-    def return_named_entities(self, nlp, articles: List[NewsArticle]):
+    def count_named_entities(
+        self, nlp, articles: List[NewsArticle], headline_docs: List["Doc"] = None
+    ) -> Dict[str, int]:
         """
-        Identifies all named entities in article title and returns them in a list sorted by frequency.
+        Count how often each named entity is mentioned in the article titles.
 
         Args:
             nlp : The spacy model
             articles : A list of NewsArticle objects
+            headline_docs : The parsed headlines, parsed here if not given
 
         Returns:
-            sorted_entities : A list of named entities, sorted by frequency
+            entity_counts : The count of each named entity, sorted by frequency
         """
-        headlines = [article.title for article in articles]
-        headline_str = " ".join(headlines)
-        headline_doc = nlp(headline_str)
+        headline_doc = self._join_headlines(nlp, articles, headline_docs)
 
         # Use spacy's NER capability
         named_entities = []
@@ -188,36 +543,58 @@ class NewsScraper:
         sorted_entities = sorted(
             entity_counts.items(), key=lambda x: x[1], reverse=True
         )
+        return dict(sorted_entities)
 
-        only_entities = []
-        for entity, count in sorted_entities:
-            only_entities.append(entity)
-
-            # If you'd like to have the count as well:
-            # print(f"{entity}: {count}")
+    def _join_headlines(
+        self, nlp, articles: List[NewsArticle], headline_docs: List["Doc"] = None
+    ) -> "Doc":
+        """
+        Combine the parsed headlines into a single Doc, as if all headlines had been
+        joined by spaces and parsed together, without running the pipeline again.
+        """
+        from spacy.tokens import Doc
 
-        return only_entities
+        if headline_docs is None:
+            headline_docs = self.parse_headlines(nlp, articles)
+        if not headline_docs:
+            return nlp.make_doc("")
+        return Doc.from_docs(headline_docs, ensure_whitespace=True)
 
-    def save_articles(self, articles: List[NewsArticle], outfile: Path):
+    def save_articles(
+        self, articles: List[NewsArticle], outfile: Path, append: bool = False
+    ):
         """
-        Save articles to a csv file.
+        Save articles to a file, in the format given by its suffix, see create_writer.
 
         Args:
             articles : A list of NewsArticle objects
             outfile : Path to the output file
+            append : Whether to add to an existing file instead of replacing it
         """
-        # Specify where to save the search results
-        outfile.parent.mkdir(exist_ok=True, parents=True)
-
-        with open(outfile, "w") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["title", "URL", "publication_date", "relevancy_score"])
-            for article in articles:
-                writer.writerow(
-                    [
-                        article.title,
-                        article.URL,
-                        article.last_updated,
-                        article.relevancy_score,
-                    ]
-                )
+        with create_writer(outfile, append=append) as writer:
+            writer.write(articles)
+
+
+def load_stopwords(language: Language):
+    """
+    Return the spacy stop words of a language.
+    """
+    return importlib.import_module(STOPWORD_MODULES[Language(language)]).STOP_WORDS
+
+
+# Scraper of an analysis worker process, see NewsScraper.fetch_many
+_worker_scraper: NewsScraper = None
+
+
+def _init_analysis_worker(options: dict):
+    global _worker_scraper
+    # Workers only analyze articles, fetching and saving stays in the main process
+    _worker_scraper = NewsScraper(backend=None, save_on_fetch=False, **options)
+    _worker_scraper.models.preload([_worker_scraper.language])
+
+
+def _analyze_in_worker(
+    topic: str, articles: List[NewsArticle], max_num_articles: int
+) -> Tuple[TopicResult, Any]:
+    result = _worker_scraper.analyze_articles(topic, articles, max_num_articles)
+    return result, _worker_scraper.summarizer.pop_updates()
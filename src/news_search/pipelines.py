@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple, Iterable, Optional
+from functools import lru_cache
+from dataclasses import dataclass
+
+if TYPE_CHECKING:
+    from spacy.language import Language as SpacyLanguage
+    from spacy.tokens import Doc
+
+# Components of the spacy pipelines that set sentence boundaries themselves
+SENTENCE_COMPONENTS = {"parser", "senter"}
+
+
+@dataclass(frozen=True)
+class PipelineProfile:
+    """
+    Struct for the parts of the spacy pipeline a stage needs
+    """
+
+    # Names of the pipeline components to run, None to run the full pipeline.
+    # Embedding components the listed components listen to are added automatically.
+    components: Optional[Tuple[str, ...]] = None
+    # Whether sentence boundaries are needed. Unless a parser or senter runs
+    # anyway, a rule-based sentencizer sets them instead.
+    sentences: bool = False
+
+
+# Tokenization alone is enough for the static word vectors of the relevance
+# stage, summaries need sentences but no parse, and only NER needs its model
+DEFAULT_PROFILES = {
+    "rate_relevance": PipelineProfile(components=()),
+    "generate_summary": PipelineProfile(components=(), sentences=True),
+    "return_named_entities": PipelineProfile(components=("ner",)),
+}
+
+# Profiles running the full pipeline for every stage, as before profiles existed
+FULL_PIPELINE_PROFILES = {
+    stage: PipelineProfile(components=None, sentences=profile.sentences)
+    for stage, profile in DEFAULT_PROFILES.items()
+}
+
+
+def combine_profiles(profiles: Iterable[PipelineProfile]) -> PipelineProfile:
+    """
+    Combine profiles into one that satisfies all of them, so that stages can
+    share the Docs of a single pass through the pipeline.
+    """
+    components: Optional[set] = set()
+    sentences = False
+    for profile in profiles:
+        if profile.components is None:
+            components = None
+        elif components is not None:
+            components.update(profile.components)
+        sentences = sentences or profile.sentences
+
+    if components is None:
+        return PipelineProfile(components=None, sentences=sentences)
+    return PipelineProfile(components=tuple(sorted(components)), sentences=sentences)
+
+
+def disabled_components(
+    nlp: "SpacyLanguage", profile: PipelineProfile
+) -> Tuple[List[str], bool]:
+    """
+    Work out which components of a pipeline can be skipped for a profile.
+
+    Args:
+        nlp : The spacy model
+        profile : The profile to run
+
+    Returns:
+        The names of the components to disable, and whether a sentencizer has
+        to set sentence boundaries afterwards
+    """
+    if profile.components is None:
+        enabled = set(nlp.pipe_names)
+    else:
+        enabled = set(profile.components) & set(nlp.pipe_names)
+        # Shared embedding layers, such as tok2vec, must run for their listeners
+        for name, component in nlp.pipeline:
+            listeners = getattr(component, "listening_components", None) or []
+            if enabled & set(listeners):
+                enabled.add(name)
+
+    disabled = [name for name in nlp.pipe_names if name not in enabled]
+    needs_sentencizer = profile.sentences and not (enabled & SENTENCE_COMPONENTS)
+    return disabled, needs_sentencizer
+
+
+def resolve_profiles(
+    overrides: Dict[str, PipelineProfile] = None,
+) -> Dict[str, PipelineProfile]:
+    """
+    Return the default profiles, with the profiles of some stages replaced.
+    """
+    profiles = dict(DEFAULT_PROFILES)
+    if overrides:
+        unknown = set(overrides) - set(profiles)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+        profiles.update(overrides)
+    return profiles
+
+
+@lru_cache(maxsize=None)
+def _sentencizer():
+    from spacy.pipeline import Sentencizer
+
+    return Sentencizer()
+
+
+def parse(
+    nlp: "SpacyLanguage",
+    texts: Iterable[str],
+    profile: PipelineProfile,
+    batch_size: int = 64,
+) -> List["Doc"]:
+    """
+    Run only the parts of the pipeline a profile needs over texts, in batches.
+
+    Args:
+        nlp : The spacy model
+        texts : The texts to parse
+        profile : The profile to run
+        batch_size : Number of texts handed to the pipeline at once
+
+    Returns:
+        A list of spacy Docs, one per text and in the same order
+    """
+    disabled, needs_sentencizer = disabled_components(nlp, profile)
+    docs = nlp.pipe(texts, batch_size=batch_size, disable=disabled)
+    if needs_sentencizer:
+        sentencizer = _sentencizer()
+        docs = (sentencizer(doc) for doc in docs)
+    return list(docs)
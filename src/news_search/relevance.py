@@ -0,0 +1,80 @@
+from enum import Enum
+from typing import TYPE_CHECKING, Sequence
+
+# numpy is imported by the functions themselves, so that importing the package
+# stays cheap for everyone not scoring relevance
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class RelevanceMode(str, Enum):
+    """
+    Enum for the supported ways of scoring headlines against a query
+    """
+
+    # Call Doc.similarity once per headline and sort all articles
+    pairwise = "pairwise"
+    # Score all headlines in one matrix operation and only select the top k
+    vectorized = "vectorized"
+
+
+def cosine_similarities(
+    query_vector: "np.ndarray", vectors: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Compute the cosine similarity between a query vector and each row of a matrix.
+
+    Mirrors spacy's Doc.similarity, i.e. rows or queries without a vector score 0.
+
+    Args:
+        query_vector : Vector of the query, of shape (dim,)
+        vectors : Matrix of headline vectors, of shape (num_headlines, dim)
+
+    Returns:
+        The similarity scores, of shape (num_headlines,)
+    """
+    import numpy as np
+
+    query_norm = np.linalg.norm(query_vector)
+    norms = np.linalg.norm(vectors, axis=1)
+    if query_norm == 0:
+        return np.zeros(len(vectors), dtype=vectors.dtype)
+
+    denominators = norms * query_norm
+    dots = vectors @ query_vector
+    scores = np.zeros_like(dots)
+    np.divide(dots, denominators, out=scores, where=denominators != 0)
+    return scores
+
+
+def top_k_indices(scores: Sequence[float], k: int = None) -> "np.ndarray":
+    """
+    Return the indices of the k highest scores, sorted by descending score.
+
+    Only the k best entries are sorted, the rest is discarded with a partial
+    selection. Ties keep their original order, like a stable sort would.
+
+    Args:
+        scores : The scores to select from
+        k : The number of indices to return, all indices if not given
+
+    Returns:
+        The indices of the top k scores
+    """
+    import numpy as np
+
+    scores = np.asarray(scores)
+    num_scores = len(scores)
+    if k is None or k >= num_scores:
+        candidates = np.arange(num_scores)
+    elif k <= 0:
+        return np.arange(0)
+    else:
+        # Keep every score tied with the k-th best, argpartition would pick an
+        # arbitrary subset of them
+        kth_score = -np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores >= kth_score)
+
+    # lexsort sorts by the last key first, so ties fall back to the index
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
@@ -0,0 +1,303 @@
+import json
+import logging
+from typing import Any, Callable, Dict, Tuple, Hashable, Iterable
+from datetime import datetime, timedelta
+from threading import Lock
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from concurrent.futures import Future
+
+from news_search.models import ModelRegistry, model_registry
+from news_search.trends import TrendTracker
+from news_search.vector_cache import VectorCache
+from news_search.backends import Language, NewsBackend
+from news_search.summarizers import Summarizer, TfIdfSummarizer
+from news_search.news_scraper import NewsScraper, TopicResult
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCoalescer:
+    """
+    Runs concurrent calls with the same key only once, and hands the result of
+    that single call to every caller waiting for it.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+        # Number of calls that were answered by another call already in flight
+        self.coalesced = 0
+
+    def run(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+        Call function, unless a call with the same key is already running, in
+        which case its result (or exception) is shared instead.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class NewsService:
+    """
+    Long-running search service keeping models and backends warm between queries.
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, NewsBackend],
+        languages: Iterable[Language] = tuple(Language),
+        max_num_articles: int = 15,
+        window: timedelta = timedelta(days=30),
+        models: ModelRegistry = None,
+        summarizers: Dict[Language, Summarizer] = None,
+        trend_tracker: TrendTracker = None,
+        vector_cache: VectorCache = None,
+    ):
+        """
+        Args:
+            backends : The backends to offer, by name
+            languages : The languages to offer
+            max_num_articles : Default number of articles to return per query
+            window : How far back articles are searched for
+            models : Registry to take the spacy models from
+            summarizers : Summarizer for each language, shared by all backends
+            trend_tracker : Tracker receiving the named entities of every query
+            vector_cache : Persistent cache of headline vectors, shared by all queries
+        """
+        self.backends = backends
+        self.languages = [Language(language) for language in languages]
+        self.max_num_articles = max_num_articles
+        self.window = window
+        self.models = models if models is not None else model_registry
+        self.vector_cache = vector_cache
+        self.coalescer = QueryCoalescer()
+        if summarizers is None:
+            summarizers = {language: TfIdfSummarizer() for language in self.languages}
+        self.summarizers = summarizers
+        self.trend_tracker = (
+            trend_tracker if trend_tracker is not None else TrendTracker()
+        )
+
+        self._scrapers: Dict[Tuple[str, Language], NewsScraper] = {}
+        # spacy models are not guaranteed to be thread safe, so every model is only
+        # used by one query at a time, while fetching still happens in parallel
+        self._model_locks = {language: Lock() for language in self.languages}
+
+    def warm_up(self):
+        """
+        Load and warm up the models of all offered languages.
+        """
+        self.models.preload(self.languages)
+
+    def save(self):
+        """
+        Persist what the summarizers and the trend tracker learned from the
+        queries answered so far.
+        """
+        for summarizer in self.summarizers.values():
+            summarizer.save()
+        self.trend_tracker.save()
+
+    def trends(
+        self, language: Language = Language.english, k: int = 10, hours: float = 24
+    ) -> Dict[str, Any]:
+        """
+        Report the named entities rising most over all queries answered so far.
+
+        Args:
+            language : Language of the entities
+            k : Number of entities to report
+            hours : Length of the periods to compare, the last one and the one before
+
+        Returns:
+            The entities with their counts in both periods, ready for JSON
+        """
+        language = Language(language)
+        trends = self.trend_tracker.trending(language, k, timedelta(hours=hours))
+        return {
+            "language": language.value,
+            "hours": hours,
+            "entities": [
+                {
+                    "entity": trend.entity,
+                    "count": trend.count,
+                    "previous_count": trend.previous_count,
+                }
+                for trend in trends
+            ],
+        }
+
+    def search(
+        self,
+        topic: str,
+        language: Language = Language.english,
+        backend: str = None,
+        max_num_articles: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer a query, sharing the work with identical queries already running.
+
+        Args:
+            topic : Topic to query the web for
+            language : Language of the articles
+            backend : Name of the backend, the first offered backend if not given
+            max_num_articles : The total number of articles to return
+
+        Returns:
+            The summary, named entities and relevance sorted articles, ready for JSON
+        """
+        if not topic:
+            raise ValueError("A topic is required.")
+        language = Language(language)
+        if language not in self.languages:
+            raise ValueError(f"Language {language.value} is not offered.")
+        if backend is None:
+            backend = next(iter(self.backends))
+        if backend not in self.backends:
+            raise ValueError(f"Backend {backend} unknown or unsupported!")
+        if max_num_articles is None:
+            max_num_articles = self.max_num_articles
+
+        key = (topic, language, backend, max_num_articles)
+        result = self.coalescer.run(
+            key, lambda: self._search(topic, language, backend, max_num_articles)
+        )
+        return {
+            "topic": topic,
+            "language": language.value,
+            "backend": backend,
+            "summary": result.summary,
+            "named_entities": result.named_entities,
+            "articles": [asdict(article) for article in result.articles],
+        }
+
+    def _search(
+        self, topic: str, language: Language, backend: str, max_num_articles: int
+    ) -> TopicResult:
+        scraper = self._scraper(backend, language)
+        articles = scraper.backend.fetch_for_topic(
+            topic, max_num_articles, datetime.now() - self.window, language
+        )
+        with self._model_locks[language]:
+            return scraper.analyze_articles(topic, articles, max_num_articles)
+
+    def _scraper(self, backend: str, language: Language) -> NewsScraper:
+        key = (backend, language)
+        if key not in self._scrapers:
+            self._scrapers[key] = NewsScraper(
+                backend=self.backends[backend],
+                save_on_fetch=False,
+                language=language,
+                models=self.models,
+                summarizer=self.summarizers.get(language),
+                trend_tracker=self.trend_tracker,
+                vector_cache=self.vector_cache,
+            )
+        return self._scrapers[key]
+
+
+class NewsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /search?topic=...&language=...&backend=...&max_num_articles=...,
+    GET /trends?language=...&k=...&hours=... and GET /health as JSON.
+    """
+
+    # Set on the server by create_server
+    server: "NewsServer"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "backends": list(self.server.service.backends),
+                    "languages": [
+                        language.value for language in self.server.service.languages
+                    ],
+                    "coalesced": self.server.service.coalescer.coalesced,
+                },
+            )
+            return
+        if url.path not in ("/search", "/trends"):
+            self._send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        try:
+            if url.path == "/trends":
+                response = self.server.service.trends(
+                    language=params.get("language", Language.english.value),
+                    k=int(params.get("k", 10)),
+                    hours=float(params.get("hours", 24)),
+                )
+            else:
+                max_num_articles = params.get("max_num_articles")
+                response = self.server.service.search(
+                    topic=params.get("topic", ""),
+                    language=params.get("language", Language.english.value),
+                    backend=params.get("backend"),
+                    max_num_articles=(
+                        int(max_num_articles) if max_num_articles else None
+                    ),
+                )
+        except ValueError as error:
+            self._send_json(400, {"error": str(error)})
+        except Exception as error:
+            logger.exception("Query %r failed", params)
+            self._send_json(502, {"error": f"{type(error).__name__}: {error}"})
+        else:
+            self._send_json(200, response)
+
+    def _send_json(self, status: int, content: Dict[str, Any]):
+        body = json.dumps(content, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class NewsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: NewsService):
+        super().__init__(address, NewsRequestHandler)
+        self.service = service
+
+
+def create_server(
+    service: NewsService, host: str = "127.0.0.1", port: int = 8000
+) -> NewsServer:
+    """
+    Create an HTTP server answering queries with the given service, one thread per
+    request. Call serve_forever on it to start serving.
+    """
+    return NewsServer((host, port), service)
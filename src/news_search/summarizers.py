@@ -0,0 +1,300 @@
+import os
+import json
+import math
+from typing import TYPE_CHECKING, Dict, List, Union, Iterable, Optional, AbstractSet
+from heapq import nlargest
+from string import punctuation
+from pathlib import Path
+from hashlib import blake2b
+from threading import Lock
+from collections import Counter, OrderedDict
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Token
+
+
+class Summarizer:
+    """
+    Base class for the engines turning parsed headlines into an extractive summary.
+
+    Summarizers may learn from the headlines they see. When analysis runs in
+    worker processes, each worker gets a copy of the summarizer, and what the
+    copies learned is handed back to the original with pop_updates and
+    apply_updates.
+    """
+
+    def __init__(self, ratio: float = 0.2):
+        """
+        Args:
+            ratio : Share of the sentences to keep in the summary
+        """
+        self.ratio = ratio
+
+    def summarize(self, headline_docs: List["Doc"], stopwords: AbstractSet[str]) -> str:
+        """
+        Summarize parsed headlines.
+
+        Args:
+            headline_docs : The parsed headlines, with sentence boundaries
+            stopwords : The stop words of the headlines' language
+
+        Returns:
+            A brief summary of the headlines
+        """
+        raise NotImplementedError
+
+    def pop_updates(self):
+        """
+        Return what this copy of the summarizer learned since it was copied, and forget it.
+        """
+        return None
+
+    def apply_updates(self, updates):
+        """
+        Learn what a copy of the summarizer returned from pop_updates.
+        """
+
+    def save(self):
+        """
+        Persist what the summarizer learned, if it keeps anything.
+        """
+
+    def _select_sentences(self, headline_docs: List["Doc"], term_weights) -> str:
+        """
+        Join the headlines, score each sentence by the weights of its terms, and
+        return the best scoring sentences.
+        """
+        from spacy.tokens import Doc
+
+        headline_doc = Doc.from_docs(headline_docs, ensure_whitespace=True)
+        sent_tokens = list(headline_doc.sents)
+        sent_scores = {}
+        for sent in sent_tokens:
+            for word in sent:
+                weight = term_weights.get(word.lower_)
+                if weight is not None:
+                    sent_scores[sent] = sent_scores.get(sent, 0) + weight
+
+        num_sentences = int(len(sent_tokens) * self.ratio)
+        summary = nlargest(n=num_sentences, iterable=sent_scores, key=sent_scores.get)
+        return " ".join(sent.text for sent in summary)
+
+
+class FrequencySummarizer(Summarizer):
+    """
+    Scores sentences by the raw frequency of their words within the query alone.
+    """
+
+    def summarize(self, headline_docs: List["Doc"], stopwords: AbstractSet[str]) -> str:
+        if not headline_docs:
+            return ""
+
+        freq_of_word = Counter(
+            word.lower_
+            for doc in headline_docs
+            for word in doc
+            if word.lower_ not in stopwords and word.lower_ not in punctuation
+        )
+        if not freq_of_word:
+            return ""
+
+        # Normalize word frequency
+        max_freq = max(freq_of_word.values())
+        term_weights = {word: freq / max_freq for word, freq in freq_of_word.items()}
+        return self._select_sentences(headline_docs, term_weights)
+
+
+class TermStatistics:
+    """
+    Document frequencies of terms across every headline seen so far, where each
+    headline counts as one document.
+
+    The number of terms is bounded. Once it is exceeded, the rarest terms are
+    forgotten, and count as unseen again. Headlines seen before, for example when
+    a topic is queried again, are recognized and not counted twice.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = None,
+        max_terms: int = 50000,
+        max_headlines: int = 20000,
+    ):
+        """
+        Args:
+            path : JSON file to load the statistics from and save them to, None to keep them in memory
+            max_terms : Maximum number of terms to keep document frequencies for
+            max_headlines : Maximum number of headlines to remember as seen
+        """
+        self.path = Path(path) if path is not None else None
+        self.max_terms = max_terms
+        self.max_headlines = max_headlines
+        self.num_documents = 0
+        self.document_frequency: Dict[str, int] = {}
+        # Fingerprints of the headlines seen most recently, oldest first
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        # Headlines added since this copy was unpickled in a worker, None in the original
+        self._pending: Optional[Dict[str, List[str]]] = None
+        self._lock = Lock()
+
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def fingerprint(headline: str) -> str:
+        """
+        Return the key a headline is recognized by.
+        """
+        return blake2b(headline.casefold().encode(), digest_size=8).hexdigest()
+
+    def update(self, documents: Dict[str, Iterable[str]]):
+        """
+        Count the terms of new documents.
+
+        Args:
+            documents : The terms of each document, by the fingerprint of its headline
+        """
+        with self._lock:
+            for key, terms in documents.items():
+                if key in self._seen:
+                    self._seen.move_to_end(key)
+                    continue
+
+                self._seen[key] = None
+                if len(self._seen) > self.max_headlines:
+                    self._seen.popitem(last=False)
+
+                terms = set(terms)
+                self.num_documents += 1
+                for term in terms:
+                    self.document_frequency[term] = (
+                        self.document_frequency.get(term, 0) + 1
+                    )
+                if self._pending is not None:
+                    self._pending[key] = sorted(terms)
+
+            if len(self.document_frequency) > self.max_terms:
+                self._prune()
+
+    def idf(self, term: str) -> float:
+        """
+        Return the smoothed inverse document frequency of a term.
+        """
+        document_frequency = self.document_frequency.get(term, 0)
+        return math.log((1 + self.num_documents) / (1 + document_frequency)) + 1
+
+    def pop_pending(self) -> Dict[str, List[str]]:
+        """
+        Return the documents added to this copy since it was unpickled, and forget them.
+        """
+        with self._lock:
+            if self._pending is None:
+                return {}
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def save(self):
+        """
+        Write the statistics to their file, atomically.
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            content = {
+                "num_documents": self.num_documents,
+                "document_frequency": self.document_frequency,
+                "seen": list(self._seen),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as file:
+                json.dump(content, file)
+            os.replace(tmp_path, self.path)
+
+    def _load(self):
+        with open(self.path) as file:
+            content = json.load(file)
+        self.num_documents = content["num_documents"]
+        self.document_frequency = content["document_frequency"]
+        self._seen = OrderedDict.fromkeys(content["seen"][-self.max_headlines :])
+        if len(self.document_frequency) > self.max_terms:
+            self._prune()
+
+    def _prune(self):
+        # Drop a tenth more than necessary, so pruning does not happen on every update
+        keep = int(self.max_terms * 0.9)
+        self.document_frequency = dict(
+            nlargest(keep, self.document_frequency.items(), key=lambda item: item[1])
+        )
+
+    def __getstate__(self):
+        # Copies in worker processes must not write to the file of the original
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["path"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+        self._pending = {}
+
+
+class TfIdfSummarizer(Summarizer):
+    """
+    Scores sentences by the TF-IDF weights of their words, with the document
+    frequencies taken from every headline seen so far, across queries.
+
+    Words common to nearly all headlines, whatever the topic, weigh less than
+    words that are frequent within this query but rare elsewhere.
+    """
+
+    def __init__(self, statistics: TermStatistics = None, ratio: float = 0.2):
+        """
+        Args:
+            statistics : The document frequencies to use and update, fresh in-memory statistics if not given
+            ratio : Share of the sentences to keep in the summary
+        """
+        super().__init__(ratio)
+        self.statistics = statistics if statistics is not None else TermStatistics()
+
+    def summarize(self, headline_docs: List["Doc"], stopwords: AbstractSet[str]) -> str:
+        if not headline_docs:
+            return ""
+
+        documents = {}
+        term_frequency = Counter()
+        for doc in headline_docs:
+            terms = [word.lower_ for word in doc if _is_term(word, stopwords)]
+            documents[TermStatistics.fingerprint(doc.text)] = terms
+            term_frequency.update(terms)
+        if not term_frequency:
+            return ""
+
+        # The headlines of this query count as documents too, so no term is unseen
+        self.statistics.update(documents)
+
+        term_weights = {
+            term: frequency * self.statistics.idf(term)
+            for term, frequency in term_frequency.items()
+        }
+        max_weight = max(term_weights.values())
+        term_weights = {
+            term: weight / max_weight for term, weight in term_weights.items()
+        }
+        return self._select_sentences(headline_docs, term_weights)
+
+    def pop_updates(self) -> Dict[str, List[str]]:
+        return self.statistics.pop_pending()
+
+    def apply_updates(self, updates: Dict[str, List[str]]):
+        if updates:
+            self.statistics.update(updates)
+
+    def save(self):
+        self.statistics.save()
+
+
+def _is_term(word: "Token", stopwords: AbstractSet[str]) -> bool:
+    return not (word.is_punct or word.is_space or word.lower_ in stopwords)
@@ -0,0 +1,256 @@
+import os
+import json
+import time
+from typing import Dict, List, Tuple, Union, Iterable, Optional
+from pathlib import Path
+from datetime import datetime, timedelta
+from threading import Lock
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from news_search.backends import Language
+
+
+class SpaceSaving:
+    """
+    Space-Saving sketch of the most frequent items of a stream, in fixed memory.
+
+    At most capacity items are counted. A new item replaces the least frequent
+    one and inherits its count, which is remembered as the item's maximum
+    overestimation. Every item more frequent than total / capacity is kept.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+            return
+
+        error = 0
+        if len(self.counts) >= self.capacity:
+            evicted = min(self.counts, key=self.counts.get)
+            error = self.counts.pop(evicted)
+            del self.errors[evicted]
+        self.counts[item] = error + count
+        self.errors[item] = error
+
+    def top(self, k: int = None) -> List[Tuple[str, int]]:
+        """
+        Return the k most frequent items with their estimated counts.
+        """
+        return Counter(self.counts).most_common(k)
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, content: dict, capacity: int) -> "SpaceSaving":
+        sketch = cls(capacity)
+        # Keep only the most frequent items if the capacity shrunk since saving
+        sketch.counts = dict(Counter(content["counts"]).most_common(capacity))
+        sketch.errors = {item: content["errors"][item] for item in sketch.counts}
+        return sketch
+
+
+@dataclass
+class EntityTrend:
+    """
+    Struct for how often an entity was named in a period and the period before
+    """
+
+    entity: str
+    count: int
+    previous_count: int
+
+    @property
+    def change(self) -> int:
+        return self.count - self.previous_count
+
+
+class TrendTracker:
+    """
+    Counts the named entities of every query per language and time window, to
+    tell which entities are rising.
+
+    Every window holds a Space-Saving sketch of fixed capacity, and only the most
+    recent max_windows windows of each language are kept, so memory stays bounded
+    no matter how many queries come in.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = None,
+        window: timedelta = timedelta(hours=1),
+        max_windows: int = 24 * 14,
+        capacity: int = 200,
+    ):
+        """
+        Args:
+            path : JSON file to load the windows from and save them to, None to keep them in memory
+            window : Length of each time window
+            max_windows : Number of most recent windows to keep per language
+            capacity : Number of entities counted per window
+        """
+        self.path = Path(path) if path is not None else None
+        self.window_seconds = int(window.total_seconds())
+        self.max_windows = max_windows
+        self.capacity = capacity
+        # Sketches by language, then by window start in seconds since the epoch, oldest first
+        self._windows: Dict[Language, "OrderedDict[int, SpaceSaving]"] = {}
+        self._lock = Lock()
+
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def add(
+        self,
+        entities: Union[Dict[str, int], Iterable[str]],
+        language: Language,
+        timestamp: float = None,
+    ):
+        """
+        Count named entities.
+
+        Args:
+            entities : The entities with their counts, or one entry per mention
+            language : Language of the headlines the entities were found in
+            timestamp : When the entities were seen, in seconds since the epoch, now if not given
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if not isinstance(entities, dict):
+            entities = Counter(entities)
+        start = int(timestamp // self.window_seconds * self.window_seconds)
+
+        with self._lock:
+            windows = self._windows.setdefault(Language(language), OrderedDict())
+            sketch = windows.get(start)
+            if sketch is None:
+                if windows and start < next(iter(windows)):
+                    # Older than every kept window, it would be dropped right away
+                    if len(windows) >= self.max_windows:
+                        return
+                sketch = windows[start] = SpaceSaving(self.capacity)
+                # Entities may come in late, so keep the windows sorted by start
+                for later in [later for later in windows if later > start]:
+                    windows.move_to_end(later)
+                while len(windows) > self.max_windows:
+                    windows.popitem(last=False)
+
+            for entity, count in entities.items():
+                sketch.add(entity, count)
+
+    def top(
+        self,
+        language: Language,
+        k: int = 10,
+        start: datetime = None,
+        end: datetime = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Return the k entities named most often in a period.
+
+        Args:
+            language : Language to report on
+            k : Number of entities to return
+            start : Beginning of the period, the oldest kept window if not given
+            end : End of the period, now if not given
+
+        Returns:
+            The entities and their estimated counts, most frequent first
+        """
+        return self._counts(language, start, end).most_common(k)
+
+    def trending(
+        self,
+        language: Language,
+        k: int = 10,
+        period: timedelta = timedelta(days=1),
+        now: datetime = None,
+    ) -> List[EntityTrend]:
+        """
+        Return the k entities whose count rose most in the last period, compared
+        to the period before.
+
+        Args:
+            language : Language to report on
+            k : Number of entities to return
+            period : Length of the periods to compare
+            now : End of the last period, now if not given
+
+        Returns:
+            The entities with their counts, by descending rise
+        """
+        if now is None:
+            now = datetime.now()
+        counts = self._counts(language, now - period, now)
+        previous_counts = self._counts(language, now - 2 * period, now - period)
+
+        trends = [
+            EntityTrend(entity, count, previous_counts.get(entity, 0))
+            for entity, count in counts.items()
+        ]
+        trends.sort(key=lambda trend: (trend.change, trend.count), reverse=True)
+        return trends[:k]
+
+    def save(self):
+        """
+        Write the windows to their file, atomically.
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            content = {
+                "window_seconds": self.window_seconds,
+                "windows": [
+                    {"language": language.value, "start": start, **sketch.to_dict()}
+                    for language, windows in self._windows.items()
+                    for start, sketch in windows.items()
+                ],
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as file:
+                json.dump(content, file)
+            os.replace(tmp_path, self.path)
+
+    def _counts(
+        self, language: Language, start: Optional[datetime], end: Optional[datetime]
+    ) -> Counter:
+        """
+        Sum the counts of all windows starting within [start, end).
+        """
+        start_seconds = start.timestamp() if start is not None else float("-inf")
+        end_seconds = end.timestamp() if end is not None else float("inf")
+
+        counts = Counter()
+        with self._lock:
+            for window_start, sketch in self._windows.get(
+                Language(language), {}
+            ).items():
+                if start_seconds <= window_start < end_seconds:
+                    counts.update(sketch.counts)
+        return counts
+
+    def _load(self):
+        with open(self.path) as file:
+            content = json.load(file)
+        if content["window_seconds"] != self.window_seconds:
+            raise ValueError(
+                f"{self.path} holds windows of {content['window_seconds']} seconds, "
+                f"not {self.window_seconds}"
+            )
+
+        for window in sorted(content["windows"], key=lambda window: window["start"]):
+            windows = self._windows.setdefault(
+                Language(window["language"]), OrderedDict()
+            )
+            windows[window["start"]] = SpaceSaving.from_dict(window, self.capacity)
+        for windows in self._windows.values():
+            while len(windows) > self.max_windows:
+                windows.popitem(last=False)
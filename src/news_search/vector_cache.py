@@ -0,0 +1,251 @@
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple, Union, NamedTuple
+from pathlib import Path
+from hashlib import blake2b
+from threading import Lock
+from contextlib import contextmanager
+
+from news_search.backends.normalize import normalize_title
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where only threads of one process are synchronized
+    fcntl = None
+
+# numpy is imported by the methods themselves, like in news_search.relevance
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class _Table(NamedTuple):
+    # Hash of each cached entry, 0 for empty slots
+    keys: "np.ndarray"
+    vectors: "np.ndarray"
+    # Time each entry was last used, for evicting the least recently used one
+    stamps: "np.ndarray"
+
+
+class VectorCache:
+    """
+    Persistent cache of headline and query vectors in memory-mapped NumPy files.
+
+    Entries are keyed by a 64 bit hash of the model name and the normalized
+    title. The cache is a fixed size hash table: each key may only live in the
+    probe_length slots following its hash, and once these are taken the least
+    recently used one among them is replaced. Lookups read the memory-mapped
+    files directly, so worker processes share the cache through the page cache
+    without copying it, while writes are serialized with a file lock.
+
+    Vectors of different widths are kept in separate files, named after the width.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        capacity: int = 50000,
+        probe_length: int = 16,
+    ):
+        """
+        Args:
+            directory : Directory to keep the cache files in
+            capacity : Maximum number of vectors per vector width, fixing the size of the files
+            probe_length : Number of slots a key may be stored in
+        """
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.probe_length = probe_length
+        self._tables: Dict[int, _Table] = {}
+        self._lock = Lock()
+        # Serializes writers within this process, the file lock across processes
+        self._write_lock = Lock()
+
+    @staticmethod
+    def model_name(nlp) -> str:
+        """
+        Return the name a spacy model's vectors are cached under.
+        """
+        return f"{nlp.lang}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+
+    def make_keys(self, model: str, texts: List[str]) -> "np.ndarray":
+        """
+        Hash texts, normalized like titles, together with the name of the model.
+        """
+        import numpy as np
+
+        digests = b"".join(
+            blake2b(
+                f"{model}\0{normalize_title(text)}".encode(), digest_size=8
+            ).digest()
+            for text in texts
+        )
+        keys = np.frombuffer(digests, dtype="<u8").copy()
+        # 0 marks empty slots
+        keys[keys == 0] = 1
+        return keys
+
+    def get(
+        self, model: str, texts: List[str], width: int
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Look up the vectors of texts.
+
+        Args:
+            model : Name of the model the vectors come from, see model_name
+            texts : The texts to look up
+            width : Width of the model's vectors
+
+        Returns:
+            The vectors of the texts, of shape (len(texts), width), with zeros for
+            texts not found, and a mask of the texts that were found
+        """
+        import numpy as np
+
+        vectors = np.zeros((len(texts), width), dtype=np.float32)
+        found = np.zeros(len(texts), dtype=bool)
+        table = self._table(width, create=False)
+        if table is None or not texts:
+            return vectors, found
+
+        keys = self.make_keys(model, texts)
+        slots, found = self._find(table, keys)
+        vectors[found] = table.vectors[slots[found]]
+
+        # Another process might have replaced an entry while it was being read
+        found &= table.keys[slots] == keys
+        vectors[~found] = 0
+        table.stamps[slots[found]] = time.time()
+        return vectors, found
+
+    def put(self, model: str, texts: List[str], vectors: "np.ndarray"):
+        """
+        Store the vectors of texts, replacing the least recently used entries if needed.
+
+        Args:
+            model : Name of the model the vectors come from, see model_name
+            texts : The texts to store vectors for
+            vectors : The vectors, of shape (len(texts), width)
+        """
+        import numpy as np
+
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = self.make_keys(model, texts)
+
+        with self._locked():
+            table = self._table(vectors.shape[1], create=True)
+            now = time.time()
+            for key, vector in zip(keys, vectors):
+                positions = self._positions(table, key[None])[0]
+                matches = np.flatnonzero(table.keys[positions] == key)
+                if matches.size:
+                    slot = positions[matches[0]]
+                else:
+                    slot = positions[np.argmin(table.stamps[positions])]
+
+                # Readers check the key after reading, so clear it while writing
+                table.keys[slot] = 0
+                table.vectors[slot] = vector
+                table.stamps[slot] = now
+                table.keys[slot] = key
+
+    def flush(self):
+        """
+        Write all changes to disk.
+        """
+        with self._lock:
+            for table in self._tables.values():
+                for array in table:
+                    array.flush()
+
+    def __len__(self) -> int:
+        return sum(int((table.keys != 0).sum()) for table in self._tables.values())
+
+    def _find(
+        self, table: _Table, keys: "np.ndarray"
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        positions = self._positions(table, keys)
+        hits = table.keys[positions] == keys[:, None]
+        slots = positions[np.arange(len(keys)), hits.argmax(axis=1)]
+        return slots, hits.any(axis=1)
+
+    def _positions(self, table: _Table, keys: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        capacity = np.uint64(len(table.keys))
+        offsets = np.arange(min(self.probe_length, len(table.keys)), dtype=np.uint64)
+        return (keys[:, None] % capacity + offsets) % capacity
+
+    def _table(self, width: int, create: bool) -> Union[_Table, None]:
+        """
+        Open the memory-mapped files for vectors of a width, creating them if asked.
+        """
+        import numpy as np
+
+        with self._lock:
+            if width in self._tables:
+                return self._tables[width]
+
+            paths = {
+                name: self.directory / f"{name}-{width}.npy"
+                for name in ("keys", "vectors", "stamps")
+            }
+            if not all(path.exists() for path in paths.values()):
+                if not create:
+                    return None
+                # Only ever called with the file lock held, see put. Each file is
+                # moved into place once complete, the keys last, so other
+                # processes never open partially written files.
+                shapes = {
+                    "vectors": ((self.capacity, width), np.float32),
+                    "stamps": ((self.capacity,), np.float64),
+                    "keys": ((self.capacity,), np.uint64),
+                }
+                for name, (shape, dtype) in shapes.items():
+                    if paths[name].exists():
+                        continue
+                    tmp_path = paths[name].with_name(
+                        f"{name}-{width}.{os.getpid()}.tmp"
+                    )
+                    array = np.lib.format.open_memmap(
+                        tmp_path, mode="w+", dtype=dtype, shape=shape
+                    )
+                    array.flush()
+                    del array
+                    os.replace(tmp_path, paths[name])
+
+            # The capacity of existing files wins over the one given
+            table = _Table(
+                **{name: np.load(path, mmap_mode="r+") for name, path in paths.items()}
+            )
+            self._tables[width] = table
+            return table
+
+    @contextmanager
+    def _locked(self):
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "vectors.lock", "a") as lockfile:
+                fcntl.flock(lockfile, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+    def __getstate__(self):
+        # Worker processes map the same files themselves
+        return {
+            "directory": self.directory,
+            "capacity": self.capacity,
+            "probe_length": self.probe_length,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -0,0 +1,290 @@
+import os
+import json
+import heapq
+import random
+import logging
+from typing import Any, Dict, List, Tuple, Union, Callable, Iterable, Optional
+from pathlib import Path
+from datetime import datetime, timedelta
+from threading import Event, Lock, Condition, BoundedSemaphore
+from itertools import count
+from collections import OrderedDict
+from dataclasses import field, dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from news_search.backends import NewsArticle
+from news_search.news_scraper import NewsScraper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchedTopic:
+    """
+    Struct for a topic to poll regularly
+    """
+
+    topic: str
+    # Seconds between the end of a poll and the start of the next one
+    interval: float
+    # Name of the backend to poll, the watcher's first backend if not given
+    backend: Optional[str] = None
+
+
+@dataclass
+class TopicChanges:
+    """
+    Struct for what changed about a topic since its previous poll
+    """
+
+    topic: str
+    backend: str
+    polled_at: datetime
+    # Articles not seen in any previous poll, sorted by relevance
+    articles: List[NewsArticle]
+    # Summary of the new articles
+    summary: str
+    # Entities named in the new articles but not in the previous poll
+    new_entities: List[str]
+
+
+@dataclass
+class _TopicState:
+    # Time the last successful poll started, None before the first one
+    last_success: Optional[datetime] = None
+    # URLs of the articles seen so far, oldest first
+    seen_urls: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    entities: List[str] = field(default_factory=list)
+
+
+class Watcher:
+    """
+    Polls many topics at their own intervals and reports what changed.
+
+    Each poll only asks for articles published since the last successful poll
+    of the topic, and articles seen before are dropped before analysis, so the
+    NLP stages only ever process new articles. Polls are spread out by a random
+    jitter, at most max_concurrency polls run at once, and at most
+    max_per_backend of them query the same backend.
+    """
+
+    def __init__(
+        self,
+        scrapers: Dict[str, NewsScraper],
+        topics: Iterable[WatchedTopic],
+        max_num_articles: int = 15,
+        max_concurrency: int = 4,
+        max_per_backend: int = 2,
+        jitter: float = 0.1,
+        initial_window: timedelta = timedelta(days=30),
+        state_file: Union[str, Path] = None,
+        on_changes: Callable[[TopicChanges], Any] = None,
+        max_seen_urls: int = 1000,
+    ):
+        """
+        Args:
+            scrapers : Scraper for each backend, by backend name
+            topics : The topics to poll
+            max_num_articles : The total number of articles to fetch per poll
+            max_concurrency : Maximum number of polls running at the same time
+            max_per_backend : Maximum number of polls querying the same backend at the same time
+            jitter : Share of the interval by which each poll is randomly moved
+            initial_window : How far back to look on the first poll of a topic
+            state_file : JSON file to keep the last polls in across runs, None to keep them in memory
+            on_changes : Called with the changes of every poll that found new articles
+            max_seen_urls : Number of most recent article URLs to remember per topic
+        """
+        self.scrapers = scrapers
+        self.topics = list(topics)
+        self.max_num_articles = max_num_articles
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.initial_window = initial_window
+        self.state_file = Path(state_file) if state_file is not None else None
+        self.on_changes = on_changes
+        self.max_seen_urls = max_seen_urls
+
+        default_backend = next(iter(scrapers))
+        for watched in self.topics:
+            if watched.backend is None:
+                watched.backend = default_backend
+            if watched.backend not in scrapers:
+                raise ValueError(f"Backend {watched.backend} unknown or unsupported!")
+
+        self._backend_slots = {
+            name: BoundedSemaphore(max_per_backend) for name in scrapers
+        }
+        # spacy models are not guaranteed to be thread safe, see NewsService
+        self._analysis_lock = Lock()
+        self._state_lock = Lock()
+        self._states: Dict[Tuple[str, str], _TopicState] = {}
+        # Polls by the time they are due, the counter breaks ties
+        self._queue: List[Tuple[float, int, WatchedTopic]] = []
+        self._sequence = count()
+        self._condition = Condition()
+
+        if self.state_file is not None and self.state_file.exists():
+            self._load()
+
+    def run(self, stop: Event = None):
+        """
+        Poll all topics until stop is set, or forever.
+        """
+        if stop is None:
+            stop = Event()
+
+        now = datetime.now().timestamp()
+        with self._condition:
+            for watched in self.topics:
+                # Spread the first polls out, so they do not all start at once
+                delay = random.uniform(0, self.jitter) * watched.interval
+                self._schedule(watched, now + delay)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            while True:
+                watched = self._next_due(stop)
+                if watched is None:
+                    break
+                pool.submit(self._poll_and_reschedule, watched)
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def poll(self, watched: WatchedTopic) -> Optional[TopicChanges]:
+        """
+        Poll a topic once.
+
+        Returns:
+            What changed since the previous poll, None if there are no new articles
+        """
+        scraper = self.scrapers[watched.backend]
+        state = self._state(watched)
+        polled_at = datetime.now()
+        updated_after = state.last_success or polled_at - self.initial_window
+
+        with self._backend_slots[watched.backend]:
+            articles = scraper.backend.fetch_for_topic(
+                watched.topic, self.max_num_articles, updated_after, scraper.language
+            )
+
+        # Backends working with whole days return articles seen before again
+        with self._state_lock:
+            new_articles = [
+                article for article in articles if article.URL not in state.seen_urls
+            ]
+
+        changes = None
+        if new_articles:
+            with self._analysis_lock:
+                result = scraper.analyze_articles(watched.topic, new_articles)
+            changes = TopicChanges(
+                topic=watched.topic,
+                backend=watched.backend,
+                polled_at=polled_at,
+                articles=result.articles,
+                summary=result.summary,
+                new_entities=[
+                    entity
+                    for entity in result.named_entities
+                    if entity not in state.entities
+                ],
+            )
+
+        with self._state_lock:
+            for article in new_articles:
+                state.seen_urls[article.URL] = None
+            while len(state.seen_urls) > self.max_seen_urls:
+                state.seen_urls.popitem(last=False)
+            if changes is not None:
+                state.entities = result.named_entities
+            state.last_success = polled_at
+        self.save()
+
+        scraper.instrumentation.count(
+            "watch_new_articles", len(new_articles), backend=watched.backend
+        )
+        return changes
+
+    def save(self):
+        """
+        Write the state of all topics to the state file, atomically.
+        """
+        if self.state_file is None:
+            return
+
+        with self._state_lock:
+            content = [
+                {
+                    "topic": topic,
+                    "backend": backend,
+                    "last_success": (
+                        state.last_success.isoformat() if state.last_success else None
+                    ),
+                    "seen_urls": list(state.seen_urls),
+                    "entities": state.entities,
+                }
+                for (topic, backend), state in self._states.items()
+            ]
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_file.with_name(
+                f"{self.state_file.name}.{os.getpid()}.tmp"
+            )
+            with open(tmp_path, "w") as file:
+                json.dump(content, file)
+            os.replace(tmp_path, self.state_file)
+
+    def _poll_and_reschedule(self, watched: WatchedTopic):
+        try:
+            changes = self.poll(watched)
+            if changes is not None and self.on_changes is not None:
+                self.on_changes(changes)
+        except Exception:
+            # The next poll covers the gap, since the last success did not move
+            logger.exception("Failed to poll topic %r", watched.topic)
+            self.scrapers[watched.backend].instrumentation.count(
+                "watch_errors", backend=watched.backend
+            )
+        finally:
+            jitter = random.uniform(-self.jitter, self.jitter)
+            due = datetime.now().timestamp() + watched.interval * (1 + jitter)
+            with self._condition:
+                self._schedule(watched, due)
+                self._condition.notify()
+
+    def _schedule(self, watched: WatchedTopic, due: float):
+        heapq.heappush(self._queue, (due, next(self._sequence), watched))
+
+    def _next_due(self, stop: Event) -> Optional[WatchedTopic]:
+        """
+        Wait for the next poll to become due, or return None once stop is set.
+        """
+        with self._condition:
+            while not stop.is_set():
+                timeout = 1.0
+                if self._queue:
+                    due, _, watched = self._queue[0]
+                    wait = due - datetime.now().timestamp()
+                    if wait <= 0:
+                        heapq.heappop(self._queue)
+                        return watched
+                    timeout = min(wait, timeout)
+                # Wake up regularly to notice stop being set
+                self._condition.wait(timeout)
+        return None
+
+    def _state(self, watched: WatchedTopic) -> _TopicState:
+        with self._state_lock:
+            return self._states.setdefault(
+                (watched.topic, watched.backend), _TopicState()
+            )
+
+    def _load(self):
+        with open(self.state_file) as file:
+            content = json.load(file)
+        for entry in content:
+            last_success = entry["last_success"]
+            self._states[(entry["topic"], entry["backend"])] = _TopicState(
+                last_success=(
+                    datetime.fromisoformat(last_success) if last_success else None
+                ),
+                seen_urls=OrderedDict.fromkeys(entry["seen_urls"]),
+                entities=entry["entities"],
+            )
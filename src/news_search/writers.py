@@ -0,0 +1,215 @@
+import os
+import csv
+import json
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Type, Union, Iterable, Iterator
+from pathlib import Path
+
+from news_search.backends import NewsArticle
+
+if TYPE_CHECKING:
+    import pyarrow
+
+# Columns written for every article, after the topic if the writer includes it
+ARTICLE_COLUMNS = ["title", "URL", "publication_date", "relevancy_score"]
+
+
+class ArticleWriter:
+    """
+    Base class for writers streaming articles to a file, so results never have to
+    be held in memory as a whole. Use as a context manager, or call close.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], append: bool = False, with_topic: bool = False
+    ):
+        """
+        Args:
+            path : Path of the file to write to, its directory is created if needed
+            append : Whether to add to an existing file instead of replacing it
+            with_topic : Whether to write the topic of each article as first column
+        """
+        self.path = Path(path)
+        self.append = append
+        self.columns = (["topic"] if with_topic else []) + ARTICLE_COLUMNS
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+
+    def write(self, articles: Iterable[NewsArticle], topic: str = None):
+        """
+        Write articles, as one row each.
+
+        Args:
+            articles : A list of NewsArticle objects
+            topic : Topic the articles were fetched for, written if with_topic is set
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "ArticleWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _rows(
+        self, articles: Iterable[NewsArticle], topic: str = None
+    ) -> Iterator[Dict[str, Any]]:
+        for article in articles:
+            row = {
+                "topic": topic,
+                "title": article.title,
+                "URL": article.URL,
+                "publication_date": article.last_updated,
+                "relevancy_score": article.relevancy_score,
+            }
+            yield {column: row[column] for column in self.columns}
+
+
+class CsvWriter(ArticleWriter):
+    """
+    Writes articles as CSV, with a header row unless appending to a non-empty file.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], append: bool = False, with_topic: bool = False
+    ):
+        super().__init__(path, append, with_topic)
+        self._file = open(self.path, "a" if append else "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns)
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def write(self, articles: Iterable[NewsArticle], topic: str = None):
+        for row in self._rows(articles, topic):
+            if row["publication_date"] is not None:
+                row["publication_date"] = row["publication_date"].isoformat()
+            self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonLinesWriter(ArticleWriter):
+    """
+    Writes every article as one line of JSON.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], append: bool = False, with_topic: bool = False
+    ):
+        super().__init__(path, append, with_topic)
+        self._file = open(self.path, "a" if append else "w")
+
+    def write(self, articles: Iterable[NewsArticle], topic: str = None):
+        for row in self._rows(articles, topic):
+            if row["publication_date"] is not None:
+                row["publication_date"] = row["publication_date"].isoformat()
+            self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter(ArticleWriter):
+    """
+    Writes articles to the columnar Parquet format, which requires pyarrow.
+
+    Rows are buffered and written as a row group whenever row_group_size rows have
+    come in. Parquet files cannot be appended to, so in append mode the path is a
+    dataset directory instead, and every writer adds a new part file to it.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        append: bool = False,
+        with_topic: bool = False,
+        row_group_size: int = 10000,
+    ):
+        """
+        Args:
+            path : Path of the file to write to, or of the dataset directory in append mode
+            append : Whether to add a part file to a dataset directory instead of replacing a file
+            with_topic : Whether to write the topic of each article as first column
+            row_group_size : Number of rows to buffer before writing them out
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(
+                "Writing Parquet files requires pyarrow, "
+                "install it with pip install 'news_search[parquet]'"
+            ) from None
+
+        super().__init__(path, append, with_topic)
+        self.row_group_size = row_group_size
+        self._pyarrow = pyarrow
+        self._schema = self._make_schema(pyarrow)
+        self._buffer: List[Dict[str, Any]] = []
+
+        if append:
+            self.path.mkdir(exist_ok=True, parents=True)
+            outfile = self.path / f"part-{time.time_ns()}-{os.getpid()}.parquet"
+        else:
+            outfile = self.path
+        self._writer = pyarrow.parquet.ParquetWriter(outfile, self._schema)
+
+    def write(self, articles: Iterable[NewsArticle], topic: str = None):
+        for row in self._rows(articles, topic):
+            self._buffer.append(row)
+            if len(self._buffer) >= self.row_group_size:
+                self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._buffer:
+            table = self._pyarrow.Table.from_pylist(self._buffer, schema=self._schema)
+            self._writer.write_table(table)
+            self._buffer = []
+
+    def _make_schema(self, pyarrow) -> "pyarrow.Schema":
+        types = {
+            "topic": pyarrow.string(),
+            "title": pyarrow.string(),
+            "URL": pyarrow.string(),
+            "publication_date": pyarrow.timestamp("us"),
+            "relevancy_score": pyarrow.float64(),
+        }
+        return pyarrow.schema([(column, types[column]) for column in self.columns])
+
+
+# Writers by the file suffix they are picked for
+WRITERS: Dict[str, Type[ArticleWriter]] = {
+    ".csv": CsvWriter,
+    ".jsonl": JsonLinesWriter,
+    ".ndjson": JsonLinesWriter,
+    ".parquet": ParquetWriter,
+}
+
+
+def create_writer(
+    path: Union[str, Path], append: bool = False, with_topic: bool = False
+) -> ArticleWriter:
+    """
+    Create the writer for the format of a file, as told by its suffix.
+
+    Args:
+        path : Path of the file to write to
+        append : Whether to add to an existing file instead of replacing it
+        with_topic : Whether to write the topic of each article as first column
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix not in WRITERS:
+        raise ValueError(
+            f"No writer for {suffix or 'files without suffix'}, "
+            f"supported are {', '.join(WRITERS)}"
+        )
+    return WRITERS[suffix](path, append=append, with_topic=with_topic)
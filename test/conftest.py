@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import numpy as np
+import spacy
+import pytest
+
+from news_search import Language, ModelRegistry
+
+WORDS = (
+    "the trump biden berlin election news market stocks rise fall apple google "
+    "climate change germany war ukraine economy inflation bank rates says new report"
+).split()
+
+
+@pytest.fixture(scope="session")
+def model_path(tmp_path_factory) -> Path:
+    """
+    A small English pipeline with random word vectors and a rule based NER,
+    standing in for the real spacy models.
+    """
+    nlp = spacy.blank("en")
+    rng = np.random.default_rng(0)
+    for word in WORDS:
+        nlp.vocab.set_vector(word, rng.normal(size=16).astype("float32"))
+        nlp.vocab.set_vector(word.title(), rng.normal(size=16).astype("float32"))
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns(
+        [{"label": "PERSON", "pattern": name} for name in ("Trump", "Biden")]
+        + [{"label": "GPE", "pattern": name} for name in ("Berlin", "Germany")]
+        + [{"label": "ORG", "pattern": name} for name in ("Apple", "Google")]
+    )
+
+    path = tmp_path_factory.mktemp("models") / "en_test"
+    nlp.to_disk(path)
+    return path
+
+
+@pytest.fixture
+def models(model_path) -> ModelRegistry:
+    return ModelRegistry({Language.english: str(model_path)})
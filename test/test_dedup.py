@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from news_search import Language, NewsArticle
+from news_search.dedup import simhash, drop_near_duplicates, group_near_duplicates
+from news_search.backends import SyntheticBackend
+from news_search.backends.normalize import normalize_title
+
+
+def fingerprint(title: str) -> int:
+    return simhash(normalize_title(title))
+
+
+def distance(first: str, second: str) -> int:
+    return (fingerprint(first) ^ fingerprint(second)).bit_count()
+
+
+@pytest.fixture(scope="module")
+def synthetic_titles():
+    articles = SyntheticBackend(duplicate_rate=0).fetch_for_topic(
+        "Example", 2000, datetime.now() - timedelta(days=30), Language.english
+    )
+    return [article.title for article in articles]
+
+
+@pytest.mark.parametrize("max_distance", [0, 1, 3, 6])
+def test_members_are_within_the_distance_of_their_group_leader(
+    synthetic_titles, max_distance
+):
+    groups = group_near_duplicates(synthetic_titles, max_distance)
+    assert sorted(index for group in groups for index in group) == list(
+        range(len(synthetic_titles))
+    )
+    for group in groups:
+        leader = synthetic_titles[group[0]]
+        for index in group:
+            assert distance(leader, synthetic_titles[index]) <= max_distance
+
+
+@pytest.mark.parametrize("max_distance", [1, 3])
+def test_grouping_matches_brute_force_leader_clustering(synthetic_titles, max_distance):
+    leaders, expected = [], []
+    for index, title in enumerate(synthetic_titles):
+        for leader, group in zip(leaders, expected):
+            if distance(leader, title) <= max_distance:
+                group.append(index)
+                break
+        else:
+            leaders.append(title)
+            expected.append([index])
+    assert group_near_duplicates(synthetic_titles, max_distance) == expected
+
+
+def test_titles_are_not_chained_into_one_group():
+    titles = [
+        f"Markets react as Google announces plans for rising inflation in {city}"
+        for city in ("Berlin", "Paris", "Washington", "London")
+    ]
+    max_distance = 3
+    for group in group_near_duplicates(titles, max_distance):
+        for first in group:
+            for second in group:
+                assert distance(titles[first], titles[second]) <= 2 * max_distance
+        for index in group:
+            assert distance(titles[group[0]], titles[index]) <= max_distance
+
+
+def test_drop_near_duplicates_keeps_first_and_counts_copies():
+    articles = [
+        NewsArticle("Trump wins election in Berlin.", "https://a.com/1", None, 0),
+        NewsArticle("Stocks fall as inflation rises", "https://a.com/2", None, 0),
+        NewsArticle("Trump wins election in Berlin!", "https://b.com/1", None, 0),
+        NewsArticle("trump wins election in berlin", "https://c.com/1", None, 0),
+    ]
+    kept = drop_near_duplicates(articles, max_distance=0)
+    assert [article.URL for article in kept] == ["https://a.com/1", "https://a.com/2"]
+    assert [article.duplicate_count for article in kept] == [3, 1]
@@ -0,0 +1,105 @@
+import sys
+import time
+import threading
+import subprocess
+from datetime import datetime, timedelta
+
+from news_search import Language, NewsArticle
+from news_search.backends import NewsBackend, FederatedBackend
+from news_search.backends.federated import merge_articles
+
+UPDATED_AFTER = datetime.now() - timedelta(days=1)
+
+
+class StaticBackend(NewsBackend):
+    def __init__(self, titles, delay: float = 0, timeout: float = None):
+        self.titles = titles
+        self.delay = delay
+        self.timeout = timeout
+        self.threads = []
+
+    @staticmethod
+    def get_required_args():
+        return {}
+
+    def _fetch_for_topic(self, topic, max_num_articles, updated_after, language):
+        self.threads.append(threading.current_thread())
+        time.sleep(self.delay)
+        return [
+            NewsArticle(title, f"https://example.com/{title}", None, 0)
+            for title in self.titles
+        ][:max_num_articles]
+
+
+def test_slow_backends_are_left_out_without_blocking():
+    slow = StaticBackend(["slow"], delay=2)
+    backend = FederatedBackend([StaticBackend(["fast"]), slow], timeout=0.2)
+    start = time.monotonic()
+    articles = backend.fetch_for_topic("x", 10, UPDATED_AFTER, Language.english)
+    assert time.monotonic() - start < 1
+    assert [article.title for article in articles] == ["fast"]
+    assert list(backend.last_errors) == ["1:StaticBackend"]
+    # The abandoned query does not keep the interpreter alive
+    assert slow.threads[0].is_alive() and slow.threads[0].daemon
+
+
+def test_abandoned_queries_do_not_delay_exit():
+    script = f"""
+import sys
+sys.path[:0] = {sys.path!r}
+from test_federated import *
+backend = FederatedBackend([StaticBackend(["slow"], delay=10)], timeout=0.1)
+try:
+    backend.fetch_for_topic("x", 10, UPDATED_AFTER, Language.english)
+except RuntimeError:
+    pass
+"""
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30)
+    assert time.monotonic() - start < 5
+
+
+def test_backends_with_too_many_pending_queries_are_skipped():
+    slow = StaticBackend(["slow"], delay=1)
+    backend = FederatedBackend(
+        [StaticBackend(["fast"]), slow], timeout=0.1, max_pending=1
+    )
+    backend.fetch_for_topic("x", 10, UPDATED_AFTER, Language.english)
+    start = time.monotonic()
+    backend.fetch_for_topic("x", 10, UPDATED_AFTER, Language.english)
+    assert time.monotonic() - start < 0.05
+    assert "Too many" in str(backend.last_errors["1:StaticBackend"])
+
+
+def test_timeout_is_passed_down_to_backends():
+    backends = [StaticBackend([], timeout=30), StaticBackend([], timeout=1)]
+    FederatedBackend(backends, timeouts=[5, 5])
+    assert [backend.timeout for backend in backends] == [5, 1]
+
+
+def article(title: str, url: str) -> NewsArticle:
+    return NewsArticle(title, url, None, 0)
+
+
+def test_merge_articles_drops_duplicates():
+    merged = merge_articles(
+        [
+            [article("Trump wins election", "https://a.com/1")],
+            [
+                article("Trump wins election - Reuters", "https://b.com/1"),
+                article("Something else", "https://a.com/1?utm_source=x"),
+                article("Stocks fall", "https://b.com/2"),
+            ],
+        ]
+    )
+    assert [item.title for item in merged] == ["Trump wins election", "Stocks fall"]
+
+
+def test_merge_articles_keeps_headlines_differing_after_a_dash():
+    merged = merge_articles(
+        [
+            [article("Ukraine war - live updates", "https://a.com/1")],
+            [article("Ukraine war - what we know", "https://b.com/1")],
+        ]
+    )
+    assert len(merged) == 2
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from news_search import Language, NewsArticle, NewsScraper
+from news_search.relevance import RelevanceMode, top_k_indices, cosine_similarities
+from news_search.backends.synthetic import SyntheticBackend
+
+HEADLINES = [
+    "Trump wins election in Berlin",
+    "Biden says economy will rise",
+    "Stocks fall as inflation rises",
+    "Apple and Google report new market gains",
+    "Germany bank rates rise",
+    "Climate change report says new war",
+    "Nothing known here",
+]
+
+
+def test_top_k_indices_sorts_by_descending_score():
+    scores = [0.1, 0.9, 0.5, 0.7]
+    assert top_k_indices(scores).tolist() == [1, 3, 2, 0]
+    assert top_k_indices(scores, 2).tolist() == [1, 3]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_top_k_indices_keeps_ties_in_original_order():
+    scores = np.zeros(200)
+    scores[:100] = 1
+    scores[100:110] = 2
+    scores[110:] = 0.5
+    assert top_k_indices(scores, 5).tolist() == [100, 101, 102, 103, 104]
+    stable = sorted(range(len(scores)), key=lambda index: -scores[index])
+    for k in (1, 10, 50, 150, 200):
+        assert top_k_indices(scores, k).tolist() == stable[:k]
+
+
+# The last headline has no vectors, which spacy warns about
+@pytest.mark.filterwarnings("ignore:\\[W008\\]")
+def test_cosine_similarities_match_doc_similarity(models):
+    nlp = models.get(Language.english)
+    query = nlp("trump election")
+    docs = list(nlp.pipe(HEADLINES))
+    scores = cosine_similarities(query.vector, np.vstack([doc.vector for doc in docs]))
+    expected = [doc.similarity(query) for doc in docs]
+    assert scores.tolist() == pytest.approx(expected, abs=1e-5)
+
+
+@pytest.mark.filterwarnings("ignore:\\[W008\\]")
+def test_vectorized_relevance_matches_pairwise(models):
+    results = {}
+    for mode in RelevanceMode:
+        scraper = NewsScraper(SyntheticBackend(), models=models, relevance_mode=mode)
+        articles = [
+            NewsArticle(title, f"https://example.com/{index}", None, 0)
+            for index, title in enumerate(HEADLINES)
+        ]
+        nlp = models.get(Language.english)
+        results[mode] = scraper.rate_relevance("trump election", nlp, articles)
+
+    vectorized = results[RelevanceMode.vectorized]
+    pairwise = results[RelevanceMode.pairwise]
+    assert [article.URL for article in vectorized] == [
+        article.URL for article in pairwise
+    ]
+    assert [article.relevancy_score for article in vectorized] == pytest.approx(
+        [article.relevancy_score for article in pairwise], abs=1e-5
+    )